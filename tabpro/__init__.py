@@ -9,18 +9,28 @@ from . core.io import (
     save,
 )
 
+from . core.classes.field_path import (
+    FieldPath,
+)
+
 from . core.classes.row import (
     Row,
 )
 
+from . core.classes.row_batch import (
+    RowBatch,
+)
+
 from . core.progress import (
     Progress,
 )
 
 __all__ = [
+    'FieldPath',
     'Loader',
     'Progress',
     'Row',
+    'RowBatch',
     'Writer',
     'get_loader',
     'get_writer',
@@ -19,6 +19,13 @@ def parse_and_run(
     args = parser.parse_args()
     if args.verbose:
         logger.setLevel('DEBUG')
+    # NOTE: Missing unless given before or after the command
+    if getattr(args, 'json_codec', None):
+        from . core.io import set_json_codec
+        set_json_codec(args.json_codec)
+    if getattr(args, 'workers', None) is not None:
+        from . core.io import set_num_workers
+        set_num_workers(args.workers)
     logger.debug('args: %s', args)
     if args.handler:
         args.handler(args)
@@ -76,6 +83,17 @@ def command_convert_tables(
         'Convert a table to a different format.',
     )
 
+def command_count_tables(
+    subparsers: argparse._SubParsersAction | None = None,
+):
+    from . commands.count_tables import setup_parser
+    setup_command(
+        subparsers,
+        setup_parser,
+        'count',
+        'Count the rows of tables.',
+    )
+
 def command_merge_tables(
     subparsers: argparse._SubParsersAction | None = None,
 ):
@@ -109,6 +127,18 @@ def setup_common_args(
         '--version', '-V',
         action='store_true',
     )
+    parser.add_argument(
+        '--json-codec',
+        choices=['auto', 'orjson', 'ujson', 'stdlib'],
+        default=argparse.SUPPRESS,
+        help='JSON backend (default: fastest installed, or $TABPRO_JSON_CODEC)',
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=argparse.SUPPRESS,
+        help='Worker processes for parsing large CSV files and loading many input files (0: all CPUs, default: $TABPRO_WORKERS or by the input)',
+    )
     # Only check for version flag without processing other arguments
     if '--version' in sys.argv or '-V' in sys.argv:
         print(f'tabpro v{__version__}')
@@ -123,6 +153,7 @@ def main():
     command_aggregate_tables(subparsers)
     command_compare_tables(subparsers)
     command_convert_tables(subparsers)
+    command_count_tables(subparsers)
     command_merge_tables(subparsers)
     command_sort_tables(subparsers)
 
@@ -16,6 +16,7 @@ def run(
         list_keys_to_expand=args.keys_to_expand,
         show_count_threshold=args.show_count_threshold,
         show_count_max_length=args.show_count_max_length,
+        ordered=not args.unordered,
     )
 
 def setup_parser(
@@ -67,4 +68,9 @@ def setup_parser(
         type=int,
         help='Show count max length',
     )
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help='Process the input files in the order they are loaded',
+    )
     parser.set_defaults(handler=run)
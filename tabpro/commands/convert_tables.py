@@ -21,6 +21,10 @@ def run(
         verbose = args.verbose,
         ignore_file_rows = args.ignore_file_rows,
         no_header = args.no_header,
+        table = args.table,
+        query = args.query,
+        ordered = not args.unordered,
+        prefetch = args.prefetch,
     )
 
 def setup_parser(
@@ -83,4 +87,24 @@ def setup_parser(
         action='store_true',
         help='CSV/TSV like data without header row',
     )
+    parser.add_argument(
+        '--table',
+        type=str,
+        help='Table to load from database files (e.g. SQLite)',
+    )
+    parser.add_argument(
+        '--query',
+        type=str,
+        help='Query to load the rows from database files (e.g. SQLite)',
+    )
+    parser.add_argument(
+        '--prefetch',
+        action='store_true',
+        help='Decode the rows ahead in a background thread',
+    )
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help='Process the input files in the order they are loaded',
+    )
     parser.set_defaults(handler=run)
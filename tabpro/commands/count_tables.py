@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+
+import argparse
+
+from .. core.count import count
+
+def run(
+    args: argparse.Namespace,
+):
+    count(
+        input_files=args.input_files,
+        no_header=args.no_header,
+        table=args.table,
+        query=args.query,
+        load=args.load,
+        verbose=args.verbose,
+    )
+
+def setup_parser(
+    parser: argparse.ArgumentParser,
+):
+    parser.add_argument(
+        'input_files',
+        metavar='input-file',
+        nargs='+',
+        help='Input files to count the rows',
+    )
+    parser.add_argument(
+        '--no-header',
+        action='store_true',
+        help='CSV/TSV like data without header row',
+    )
+    parser.add_argument(
+        '--table',
+        type=str,
+        help='Table to load from database files (e.g. SQLite)',
+    )
+    parser.add_argument(
+        '--query',
+        type=str,
+        help='Query to load the rows from database files (e.g. SQLite)',
+    )
+    parser.add_argument(
+        '--load',
+        action='store_true',
+        help='Count the rows by loading them instead of scanning the files',
+    )
+    parser.set_defaults(handler=run)
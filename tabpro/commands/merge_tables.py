@@ -22,6 +22,7 @@ def run(
         merge_fields=args.merge_fields,
         merge_staging=args.merge_staging,
         use_staging=args.use_staging,
+        ordered=not args.unordered,
     )
 
 def setup_parser(
@@ -91,4 +92,9 @@ def setup_parser(
         action='store_true',
         help='Use staging fields files',
     )
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help='Process the input files in the order they are loaded',
+    )
     parser.set_defaults(handler=run)
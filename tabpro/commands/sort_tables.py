@@ -13,6 +13,7 @@ def run(
         sort_keys=args.sort_keys,
         reverse=args.reverse,
         verbose=args.verbose,
+        ordered=not args.unordered,
     )
 
 def setup_parser(
@@ -41,4 +42,9 @@ def setup_parser(
         action='store_true',
         help='Reverse the sort order',
     )
+    parser.add_argument(
+        '--unordered',
+        action='store_true',
+        help='Process the input files in the order they are loaded',
+    )
     parser.set_defaults(handler=run)
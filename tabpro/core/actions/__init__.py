@@ -20,7 +20,27 @@ from .types import (
     PickConfig,
 )
 
-from ..functions.search_column_value import search_column_value
+def get_source_columns(
+    list_config: list[PickConfig],
+):
+    '''
+    Top-level columns which the picked fields might be found in.
+    '''
+    columns = []
+    for config in list_config:
+        source = config.source
+        # NOTE: The fields of the input are found in the loaded columns too
+        for prefix in [f'{STAGING_FIELD}.{INPUT_FIELD}.', f'{STAGING_FIELD}.']:
+            if source.startswith(prefix):
+                source = source[len(prefix):]
+                break
+        # NOTE: A key of the nested data may have dots itself
+        segments = source.split('.')
+        for depth in range(1, len(segments) + 1):
+            column = '.'.join(segments[:depth])
+            if column not in columns:
+                columns.append(column)
+    return columns
 
 def remap_columns(
     row: Row,
@@ -40,7 +60,12 @@ def remap_columns(
         if found:
             new_row[config.target] = value
             picked.append(found)
-    for key in row.keys(include_staging=True):
+    input_key = f'{STAGING_FIELD}.{INPUT_FIELD}'
+    # NOTE: The input field is passed without being built if possible
+    for key in row.keys(include_staging=True, expand_input=False):
+        if key == input_key:
+            row.share_input(new_row)
+            continue
         if key in picked:
             if not key.startswith(f'{STAGING_FIELD}.{INPUT_FIELD}.'):
                 continue
@@ -50,10 +75,9 @@ def remap_columns(
             # NOTE: Skip staging fields
             new_row[key] = row[key]
         else:
-            input_key = f'{STAGING_FIELD}.{INPUT_FIELD}.{key}'
-            if input_key in row:
+            input_value, found = row.lookup_input(key)
+            if found:
                 value = row[key]
-                input_value = row[input_key]
                 if value == input_value:
                     # NOTE: Skip if the same value in the input field
                     continue
@@ -71,10 +95,10 @@ def search_with_operator(
     matched = re.split(f'({operator_group})', source, 1)
     #ic(source, matched)
     if len(matched) == 1:
-        return search_column_value(row.nested, source)
+        return row.search(source)
     matched = map(str.strip, matched)
     left, operator, rest = matched
-    value, found = search_column_value(row.nested, left)
+    value, found = row.search(left)
     if operator == or_operator:
         if bool(value):
             return value, found
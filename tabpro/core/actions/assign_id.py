@@ -4,8 +4,6 @@
 
 # local
 
-from ..functions.search_column_value import search_column_value
-
 from .types import (
     AssignIdConfig,
     IdContextMap,
@@ -24,7 +22,7 @@ def get_key_value(
     context_values = []
     if context:
         for context_column in context:
-            value, found = search_column_value(row.nested, context_column)
+            value, found = row.search(context_column)
             if not found:
                 #raise KeyError(f'Column not found: {context_column}, existing columns: {row.flat.keys()}')
                 raise KeyError(f'Column not found: {context_column}')
@@ -33,7 +31,7 @@ def get_key_value(
     primary_columns = []
     primary_values = []
     for primary_column in primary:
-        value, found = search_column_value(row.nested, primary_column)
+        value, found = row.search(primary_column)
         if not found:
             #raise KeyError(f'Column not found: {primary_column}, existing columns: {row.flat.keys()}')
             raise KeyError(f'Column not found: {context_column}')
@@ -100,7 +98,7 @@ def assign_id(
     config: AssignIdConfig,
 ):
     if config.reverse:
-        value, found = search_column_value(row.nested, config.target)
+        value, found = row.search(config.target)
         if type(value) is str:
             if value.isdigit():
                 value = int(value)
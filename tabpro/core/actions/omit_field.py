@@ -8,10 +8,6 @@ if TYPE_CHECKING:
 
 from .types import OmitConfig
 
-from ..constants import (
-    STAGING_FIELD,
-)
-
 from ..functions.as_boolean import as_boolean
 
 def omit_field(
@@ -22,7 +18,7 @@ def omit_field(
     if not found:
         return row
     if not config.purge:
-        if f'{STAGING_FIELD}.{config.field}' not in row:
+        if config.field not in row.staging:
             row.staging[config.field] = value
     return row
 
@@ -15,9 +15,31 @@ from collections import (
     defaultdict,
 )
 
+from ..classes.field_path import FieldPath
+
+# NOTE: Config attributes holding field paths, resolved once at setup time
+FIELD_PATH_ATTRIBUTES = [
+    'condition',
+    'field',
+    'source',
+    'target',
+]
+FIELD_PATH_LIST_ATTRIBUTES = [
+    'context',
+    'primary',
+]
+
 @dataclasses.dataclass
 class BaseActionConfig:
-    pass
+    def __post_init__(self):
+        for name in FIELD_PATH_ATTRIBUTES:
+            value = getattr(self, name, None)
+            if isinstance(value, str):
+                setattr(self, name, FieldPath.of(value))
+        for name in FIELD_PATH_LIST_ATTRIBUTES:
+            value = getattr(self, name, None)
+            if isinstance(value, list):
+                setattr(self, name, [FieldPath.of(item) for item in value])
 
 from .assign import AssignConfig
 
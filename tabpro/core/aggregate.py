@@ -4,8 +4,6 @@ from typing import (
     Any,
 )
 
-import json
-import os
 import sys
 
 from collections import OrderedDict
@@ -17,7 +15,10 @@ from . progress import Progress
 # local
 
 from . io import (
-    get_loader,
+    MultiLoader,
+    get_extension,
+    get_json_codec,
+    open_file,
 )
 
 from . console.views import (
@@ -154,6 +155,7 @@ def aggregate(
     list_keys_to_show_all_count: list[str] | None = None,
     list_keys_to_expand: list[str] | None = None,
     show_count_max_length: int = 100,
+    ordered: bool = True,
 ):
     progress = Progress(
         redirect_stdout = False,
@@ -162,7 +164,7 @@ def aggregate(
     console = progress.console
     console.log('input_files: ', input_files)
     if output_file:
-        ext = os.path.splitext(output_file)[1]
+        ext = get_extension(output_file)
         if ext not in ['.json']:
             raise ValueError(f'Unsupported output file extension: {ext}')
     aggregated = OrderedDict()
@@ -174,14 +176,11 @@ def aggregate(
         list_keys_to_show_all_count = []
     if list_keys_to_expand is None: 
         list_keys_to_expand = []
-    for input_file in input_files:
-        if not os.path.exists(input_file):
-            raise FileNotFoundError(f'File not found: {input_file}')
-        loader = get_loader(
-            input_file,
-            progress=progress,
-        )
-        console.log('# rows: ', len(loader))
+    for loader in MultiLoader(
+        input_files,
+        ordered=ordered,
+        progress=progress,
+    ):
         for index, row in enumerate(loader):
             for key, value in row.items():
                 aggregate_one(
@@ -192,6 +191,7 @@ def aggregate(
                     list_keys_to_expand,
                 )
             num_input_rows += 1
+        console.log('# rows: ', loader.num_rows)
     for key, aggregation in aggregated.items():
         counter = dict_counters[key]
         if len(counter) > 0:
@@ -255,13 +255,12 @@ def aggregate(
         ))
     else:
         console.log('writing output to: ', output_file)
-        json_output = json.dumps(
+        json_output = get_json_codec().dumps(
             dict_output,
             indent=4,
-            ensure_ascii=False,
         )
         if output_file:
-            with open(output_file, 'w', encoding='utf-8') as f:
+            with open_file(output_file, 'w', encoding='utf-8') as f:
                 f.write(json_output)
         else:
             # NOTE: output redirection
@@ -0,0 +1,159 @@
+'''
+CompactRow class
+
+A row of a flat table which keeps only its values and shares the column
+layout with the other rows through a Schema. It is upgraded to a full nested
+Row in place when a field which is not one of its columns is written.
+'''
+
+from collections import (
+    OrderedDict,
+)
+
+from typing import (
+    Any,
+)
+
+from ..constants import (
+    STAGING_FIELD,
+)
+
+from .field_path import FieldPath
+from .row import Row
+from .row_snapshot import RowSnapshot
+from .schema import Schema
+
+from ..functions.flatten_row import flatten_row
+from ..functions.get_nested_field_value import get_nested_field_value
+
+class CompactRow(Row):
+    __slots__ = (
+        '_schema',
+        '_values',
+    )
+
+    def __init__(
+        self,
+        schema: Schema,
+        values: list,
+    ):
+        self._nested = None
+        self._flat = None
+        self._flat_parts = None
+        self._prefix = None
+        self._staging = None
+        self._base = None
+        self._input = None
+        self._shared = None
+        self._schema: Schema | None = schema
+        self._values: list | None = values
+
+    def _build_nested(self):
+        return self._schema.build_nested(self._values)
+
+    def as_compact(self):
+        '''
+        The shared schema and the values while the row is still compact.
+        '''
+        if self._values is None:
+            return None
+        return self._schema, self._values
+
+    def _upgrade(self):
+        if self._values is not None:
+            self._nested = self._build_nested()
+            self._schema = None
+            self._values = None
+
+    @property
+    def nested(self):
+        if self._values is not None:
+            # NOTE: Built on every access to keep the row compact
+            return self._build_nested()
+        return super().nested
+
+    @nested.setter
+    def nested(self, nested: OrderedDict):
+        self._schema = None
+        self._values = None
+        self._nested = nested
+        self._flat = None
+        self._flat_parts = None
+        self._input = None
+        self._shared = None
+
+    @property
+    def flat(self):
+        if self._values is not None:
+            if self._schema.is_flat:
+                return OrderedDict(zip(self._schema.columns, self._values))
+            return flatten_row(self._build_nested())
+        return super().flat
+
+    def _iter_flat(
+        self,
+        include_staging: bool,
+        expand_input: bool = True,
+    ):
+        if self._values is not None:
+            for key, value in self.flat.items():
+                if not include_staging:
+                    if key == STAGING_FIELD or key.startswith(STAGING_FIELD + '.'):
+                        continue
+                yield key, value
+            return
+        yield from super()._iter_flat(include_staging, expand_input)
+
+    def _lookup(self, path: FieldPath):
+        values = self._values
+        if values is None:
+            return super()._lookup(path)
+        schema = self._schema
+        index = schema.index.get(path)
+        if index is not None:
+            if index < len(values):
+                return values[index], True
+            return None, False
+        if path.segments[0] not in schema.roots:
+            return None, False
+        return get_nested_field_value(self._build_nested(), path)
+
+    def _set(self, path: FieldPath, value: Any):
+        values = self._values
+        if values is not None:
+            index = self._schema.index.get(path)
+            if index is not None and index < len(values):
+                if not isinstance(value, dict):
+                    values[index] = value
+                    return
+            self._upgrade()
+        super()._set(path, value)
+
+    def _pop(self, path: FieldPath, default: Any):
+        self._upgrade()
+        return super()._pop(path, default)
+
+    def _snapshot(self, with_values: bool):
+        if self._values is not None:
+            return RowSnapshot(
+                schema = self._schema,
+                values = list(self._values),
+                with_values = with_values,
+            )
+        return super()._snapshot(with_values)
+
+    def clone(self):
+        if self._values is not None:
+            return CompactRow(self._schema, list(self._values))
+        return super().clone()
+
+    def __len__(self):
+        if self._values is not None:
+            if self._schema.is_flat:
+                return len(self._values)
+        return super().__len__()
+
+    def __repr__(self):
+        if self._values is not None:
+            return f'CompactRow(flat={self.flat})'
+        return super().__repr__()
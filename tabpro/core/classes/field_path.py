@@ -0,0 +1,79 @@
+'''
+FieldPath class
+
+A dotted field path such as ``a.b.0.c`` parsed once into its segments.
+Paths are interned in a process-wide table, so resolving the same path
+string again costs only a dictionary lookup.
+'''
+
+from typing import (
+    Any,
+)
+
+# NOTE: Paths usually come from column names and action configs, but rows with
+#       data-driven keys could grow the table without bound
+MAX_INTERNED_PATHS = 1 << 16
+
+_interned: dict[Any, 'FieldPath'] = {}
+
+class FieldPath(str):
+    segments: tuple[str, ...]
+    indices: tuple[int | None, ...]
+    rests: tuple[str, ...]
+    steps: tuple[tuple[str, int | None, str, bool], ...]
+
+    def __new__(
+        cls,
+        path: str,
+    ):
+        self = super().__new__(cls, path)
+        segments = tuple(path.split('.'))
+        self.segments = segments
+        # NOTE: Index of the segment when it is used for a list
+        self.indices = tuple(
+            int(segment) if segment.isascii() and segment.isdigit() else None
+            for segment in segments
+        )
+        # NOTE: Remaining path from each segment, which may be a key itself
+        self.rests = tuple(
+            '.'.join(segments[index:]) for index in range(len(segments))
+        )
+        # NOTE: (segment, index, rest, is_last) for each depth, to walk the
+        #       nested data without any string operation
+        last = len(segments) - 1
+        self.steps = tuple(zip(
+            self.segments,
+            self.indices,
+            self.rests,
+            [depth == last for depth in range(len(segments))],
+        ))
+        self._prefixed: dict[str, FieldPath] = {}
+        return self
+
+    @classmethod
+    def of(
+        cls,
+        path: 'str | int | FieldPath',
+    ) -> 'FieldPath':
+        if type(path) is FieldPath:
+            return path
+        interned = _interned.get(path)
+        if interned is None:
+            if len(_interned) >= MAX_INTERNED_PATHS:
+                _interned.clear()
+            interned = FieldPath(str(path))
+            _interned[path] = interned
+        return interned
+
+    def with_prefix(
+        self,
+        prefix: str,
+    ) -> 'FieldPath':
+        prefixed = self._prefixed.get(prefix)
+        if prefixed is None:
+            prefixed = FieldPath.of(f'{prefix}.{self}')
+            self._prefixed[prefix] = prefixed
+        return prefixed
+
+    def __reduce__(self):
+        return (FieldPath.of, (str(self),))
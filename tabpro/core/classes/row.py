@@ -1,5 +1,15 @@
 '''
 Row class
+
+The nested representation is the only one that is stored. The flat view is
+derived from it only when it is requested (by writers, remap_columns, etc.)
+and cached until the next write. The flat keys of each top-level subtree are
+cached separately, so that a write only invalidates its own subtree and the
+staging subtree can be skipped as a whole.
+
+The input field of the staging area can be attached lazily from a snapshot
+of the row. The snapshot shares the top-level subtrees with the row, which
+are copied before the first modification (copy-on-write).
 '''
 
 from collections import (
@@ -12,120 +22,424 @@ from typing import (
 )
 
 from ..constants import (
+    INPUT_FIELD,
     STAGING_FIELD,
+    VALUES_FIELD,
 )
 
+from .field_path import FieldPath
+from .row_snapshot import RowSnapshot
+from .schema import Schema
+
+from ..functions.flatten_row import flatten_row
 from ..functions.get_nested_field_value import get_nested_field_value
-from ..functions.search_column_value import search_column_value
+from ..functions.search_column_value import get_search_paths
 from ..functions.set_nested_field_value import set_nested_field_value
-from ..functions.set_flat_field_value import set_flat_field_value
 
 
+INPUT_PATH = FieldPath.of(f'{STAGING_FIELD}.{INPUT_FIELD}')
+
+def _copy_nested(
+    data: Mapping | list,
+):
+    if isinstance(data, list):
+        return [
+            _copy_nested(value) if isinstance(value, (dict, list)) else value
+            for value in data
+        ]
+    copied = OrderedDict()
+    for key, value in data.items():
+        if isinstance(value, (dict, list)):
+            value = _copy_nested(value)
+        copied[key] = value
+    return copied
+
+def _get_input_key(
+    path: FieldPath,
+):
+    '''
+    Relative path of the given path under the input field of the staging
+    area, an empty string for the input field and its parents, or None.
+    '''
+    segments = path.segments
+    if segments[0] != STAGING_FIELD:
+        return None
+    if len(segments) == 1:
+        return ''
+    if segments[1] != INPUT_FIELD:
+        return None
+    if len(segments) == 2:
+        return ''
+    return path.rests[2]
+
+def _unpickle_row(
+    nested: OrderedDict,
+):
+    row = Row()
+    row._nested = nested
+    return row
+
 class Row(Mapping):
+    __slots__ = (
+        '_nested',
+        '_flat',
+        '_flat_parts',
+        '_prefix',
+        '_staging',
+        '_base',
+        '_input',
+        '_shared',
+    )
+
     def __init__(
             self,
         ):
-        self.flat = OrderedDict()
-        self.nested = OrderedDict()
+        self._nested: OrderedDict = OrderedDict()
+        self._flat: OrderedDict | None = None
+        # NOTE: Flat view of each top-level subtree (top-level key -> flat)
+        self._flat_parts: dict[str, OrderedDict] | None = None
         self._prefix: str | None = None
         self._staging: Row | None = None
+        # NOTE: The staging view shares the storage of its base row
+        self._base: Row | None = None
+        # NOTE: Snapshot to be used as the input field of the staging area
+        self._input: RowSnapshot | None = None
+        # NOTE: Top level of the last snapshot, to find the shared subtrees
+        self._shared: OrderedDict | None = None
+
+    @property
+    def nested(self):
+        if self._base is not None:
+            return self._base.nested
+        if self._input is not None:
+            self._materialize_input()
+        return self._nested
+
+    @nested.setter
+    def nested(self, nested: OrderedDict):
+        if self._base is not None:
+            self._base.nested = nested
+            return
+        self._nested = nested
+        self._flat = None
+        self._flat_parts = None
+        self._input = None
+        self._shared = None
+
+    @property
+    def flat(self):
+        if self._base is not None:
+            return self._base.flat
+        if self._input is not None:
+            self._materialize_input()
+        if self._flat is None:
+            flat = OrderedDict()
+            for key, value in self._nested.items():
+                if isinstance(value, Mapping):
+                    flat.update(self._get_flat_part(key))
+                else:
+                    flat[key] = value
+            self._flat = flat
+        return self._flat
+
+    def _get_flat_part(self, key: str):
+        if self._flat_parts is None:
+            self._flat_parts = {}
+        part = self._flat_parts.get(key)
+        if part is None:
+            part = flatten_row(self._nested[key], key)
+            self._flat_parts[key] = part
+        return part
+
+    def _invalidate(self, *keys: str):
+        '''
+        Drop the cached flat views of the given top-level keys.
+        '''
+        self._flat = None
+        if self._flat_parts:
+            for key in keys:
+                self._flat_parts.pop(key, None)
+
+    def _iter_flat(
+        self,
+        include_staging: bool,
+        expand_input: bool = True,
+    ):
+        if include_staging and (expand_input or self._input is None):
+            yield from self.flat.items()
+            return
+        # NOTE: The input field is in the staging area, no need to build it
+        for key, value in self._nested.items():
+            if isinstance(key, str):
+                if key == STAGING_FIELD and include_staging:
+                    yield from self._iter_staging(value)
+                    continue
+                if key == STAGING_FIELD or key.startswith(STAGING_FIELD + '.'):
+                    if not include_staging:
+                        continue
+            if isinstance(value, Mapping):
+                yield from self._get_flat_part(key).items()
+            else:
+                yield key, value
+
+    def _iter_staging(
+        self,
+        staging: Any,
+    ):
+        '''
+        Flat items of the staging area, with the input field not built yet
+        as one item of the value None.
+        '''
+        if not isinstance(staging, Mapping):
+            yield STAGING_FIELD, staging
+            return
+        for key, value in staging.items():
+            path = f'{STAGING_FIELD}.{key}'
+            if key == INPUT_FIELD:
+                yield path, None
+            elif isinstance(value, Mapping):
+                yield from flatten_row(value, path).items()
+            else:
+                yield path, value
+
+    def _get_base(self):
+        if self._base is None:
+            return self
+        return self._base
+
+    def _resolve(self, key):
+        path = FieldPath.of(key)
+        if self._prefix:
+            return path.with_prefix(self._prefix)
+        return path
+
+    def _lookup(self, path: FieldPath):
+        if self._input is not None:
+            key = _get_input_key(path)
+            if key is not None:
+                if key:
+                    value, found = self._input.lookup(FieldPath.of(key))
+                    if not isinstance(value, (dict, list)):
+                        return value, found
+                # NOTE: The value might be modified in place by the caller
+                self._materialize_input()
+        value, found = get_nested_field_value(self._nested, path)
+        if self._shared is not None and isinstance(value, (dict, list)):
+            if self._unshare(path):
+                value, found = get_nested_field_value(self._nested, path)
+        return value, found
+
+    def _set(self, path: FieldPath, value: Any):
+        if self._input is not None:
+            key = _get_input_key(path)
+            if key:
+                self._materialize_input()
+            elif key is not None:
+                # NOTE: The input field is overwritten
+                self._input = None
+        if self._shared is not None:
+            # NOTE: Top-level values are just replaced
+            if len(path.segments) > 1:
+                self._unshare(path)
+        set_nested_field_value(self._nested, path, value)
+        self._invalidate(path.segments[0])
+
+    def _unshare(self, path: FieldPath):
+        '''
+        Copy the top-level subtrees on the path shared with a snapshot.
+        '''
+        shared = self._shared
+        unshared = False
+        for key in (path, path.segments[0]):
+            value = self._nested.get(key)
+            if isinstance(value, (dict, list)) and value is shared.get(key):
+                self._nested[key] = _copy_nested(value)
+                self._invalidate(key)
+                unshared = True
+        return unshared
+
+    def _snapshot(self, with_values: bool):
+        nested = self._nested
+        # NOTE: Only the top level is copied, the subtrees are copied on write
+        self._nested = OrderedDict(nested)
+        self._shared = nested
+        return RowSnapshot(
+            nested = nested,
+            with_values = with_values,
+        )
+
+    def _materialize_input(self):
+        snapshot = self._input
+        self._input = None
+        nested = _copy_nested(snapshot.nested)
+        if snapshot.with_values:
+            nested[VALUES_FIELD] = OrderedDict(snapshot.positional)
+        self._set(INPUT_PATH, nested)
+
+    def _pop(self, path: FieldPath, default: Any):
+        if self._input is not None:
+            if _get_input_key(path) is not None:
+                self._materialize_input()
+        if self._shared is not None:
+            self._unshare(path)
+        if '.' in path:
+            parent_key, last_key = path.rsplit('.', 1)
+            parent, found = get_nested_field_value(self._nested, parent_key)
+            if not found:
+                return default, False
+        else:
+            parent = self._nested
+            last_key = path
+        if not isinstance(parent, dict) or last_key not in parent:
+            return default, False
+        # NOTE: The parent might be a top-level key containing dots
+        segments = path.segments
+        self._invalidate(*(
+            '.'.join(segments[:depth]) for depth in range(1, len(segments) + 1)
+        ))
+        return parent.pop(last_key), True
 
     @property
     def staging(self):
         if self._staging is None:
             row = Row()
-            row.flat = self.flat
-            row.nested = self.nested
+            row._base = self._get_base()
             row._prefix = STAGING_FIELD
             self._staging = row
         return self._staging
 
+    def snapshot(
+        self,
+        with_values: bool = False,
+    ):
+        '''
+        Take a read-only snapshot of the current values without copying them.
+        '''
+        return self._get_base()._snapshot(with_values)
+
+    def attach_input(
+        self,
+        snapshot: RowSnapshot,
+    ):
+        '''
+        Use the snapshot as the input field of the staging area, which is
+        built only when the whole row or a subtree of the input is needed.
+        '''
+        base = self._get_base()
+        # NOTE: Placeholder to keep the position of the input field
+        base._set(INPUT_PATH, None)
+        base._input = snapshot
+
+    def share_input(
+        self,
+        row: 'Row',
+    ):
+        '''
+        Attach the input field to the other row, sharing the snapshot
+        without building the input field if it is not built yet.
+        '''
+        base = self._get_base()
+        if base._input is not None:
+            row.attach_input(base._input)
+            return
+        value, found = base._lookup(INPUT_PATH)
+        if found:
+            row[INPUT_PATH] = value
+
+    def lookup_input(
+        self,
+        key: str,
+    ):
+        '''
+        Look up the input field without building it.
+        The value should not be modified.
+        '''
+        base = self._get_base()
+        if base._input is not None:
+            return base._input.lookup(FieldPath.of(key))
+        return base._lookup(FieldPath.of(key).with_prefix(str(INPUT_PATH)))
+
     def clone(self):
-        cloned = self.__class__.from_dict(self.flat)
+        cloned = Row()
+        cloned._nested = _copy_nested(self.nested)
         cloned._prefix = self._prefix
         return cloned
 
-    def get(self, key, default=None):
-        if self._prefix:
-            key = f'{self._prefix}.{key}'
-        value, found = get_nested_field_value(self.nested, key)
+    def get(self, key: str | FieldPath, default=None):
+        value, found = self._get_base()._lookup(self._resolve(key))
         if not found:
             return default
         return value
-    
+
     def iter(
         self,
         include_staging: bool = False,
+        expand_input: bool = True,
     ):
-        for key in self.flat:
-            if not include_staging:
-                if isinstance(key, str):
-                    if key == STAGING_FIELD or key.startswith(STAGING_FIELD + '.'):
-                        continue
+        '''
+        With expand_input=False, the input field not built yet is given as
+        one key instead of the keys in it.
+        '''
+        for key, _ in self._get_base()._iter_flat(include_staging, expand_input):
             yield key
 
     def items(
         self,
         include_staging: bool = False,
+        expand_input: bool = True,
     ):
-        for key, value in self.flat.items():
-            if not include_staging:
-                if isinstance(key, str):
-                    if key == STAGING_FIELD or key.startswith(STAGING_FIELD + '.'):
-                        continue
-            yield key, value
+        return self._get_base()._iter_flat(include_staging, expand_input)
 
     def keys(
         self,
         include_staging: bool = False,
+        expand_input: bool = True,
     ):
-        return self.iter(include_staging=include_staging)
-    
+        return self.iter(
+            include_staging=include_staging,
+            expand_input=expand_input,
+        )
+
     def pop(
         self,
-        key: str,
+        key: str | FieldPath,
         default: Any = None,
     ):
-        last_nested = self.nested
-        keys = key.split('.')
-        for key in keys[:-1]:
-            if key not in last_nested:
-                return default, False
-            last_nested = last_nested[key]
-        # delete flat keys
-        prefix = key
-        for flat_key in list(self.flat.keys()):
-            if flat_key == prefix or flat_key.startswith(prefix):
-                del self.flat[flat_key]
-        return last_nested.pop(keys[-1], default), True
-    
+        return self._get_base()._pop(self._resolve(key), default)
+
     def pop_staging(self):
         return self.pop(STAGING_FIELD)
 
+    def drop_staging(self):
+        '''
+        Remove the staging fields without building the input field.
+        '''
+        self._get_base()._input = None
+        self.pop(STAGING_FIELD)
+
     def search(
         self,
-        field: str,
+        field: str | FieldPath,
     ):
-        return search_column_value(self.nested, field)
+        base = self._get_base()
+        for key in get_search_paths(field):
+            value, found = base._lookup(key)
+            if found:
+                return value, key
+        return None, None
 
     def __getitem__(self, key):
-        if self._prefix:
-            key = f'{self._prefix}.{key}'
-        value, found = get_nested_field_value(self.nested, key)
+        key = self._resolve(key)
+        value, found = self._get_base()._lookup(key)
         if not found:
             raise KeyError(f'key not found: {key}')
         return value
 
     def __setitem__(self, key, value):
-        if self._prefix:
-            key = f'{self._prefix}.{key}'
-        set_nested_field_value(self.nested, key, value)
-        set_flat_field_value(self.flat, key, value)
+        self._get_base()._set(self._resolve(key), value)
 
     def __contains__(self, key):
-        if self._prefix:
-            key = f'{self._prefix}.{key}'
-        _, found = get_nested_field_value(self.nested, key)
+        _, found = self._get_base()._lookup(self._resolve(key))
         return found
 
     def __iter__(self):
@@ -136,10 +450,48 @@ class Row(Mapping):
 
     def __repr__(self):
         return f'Row(flat={self.flat}, nested={self.nested})'
-    
+
+    def __reduce__(self):
+        # NOTE: Only the nested values are pickled, without the caches
+        return (_unpickle_row, (self.nested,))
+
     @staticmethod
     def from_dict(data: dict):
         row = Row()
         for key, value in data.items():
             row[key] = value
         return row
+
+    @staticmethod
+    def from_nested(data: dict):
+        '''
+        Adopt an already nested dictionary (e.g. a parsed JSON object) as the
+        row storage without walking it.
+        '''
+        if not isinstance(data, Mapping):
+            raise ValueError(f'invalid row data: {data!r}')
+        for key in data:
+            if not isinstance(key, str) or '.' in key:
+                # NOTE: Dotted top-level keys are split as in from_dict
+                return Row.from_dict(data)
+        row = Row()
+        row._nested = data
+        return row
+
+    @staticmethod
+    def from_flat(
+        header: list[str] | Schema,
+        values: list,
+    ):
+        '''
+        Build a row from the values of a flat table.
+        Loaders should pass one Schema shared by all the rows.
+        '''
+        # NOTE: Imported here to avoid a circular import
+        from .compact_row import CompactRow
+        if not isinstance(header, Schema):
+            header = Schema(header)
+        if header.is_compact:
+            return CompactRow(header, values)
+        # NOTE: Duplicate or overlapping columns are resolved as in from_dict
+        return Row.from_dict(OrderedDict(zip(header.columns, values)))
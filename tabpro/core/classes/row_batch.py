@@ -0,0 +1,240 @@
+'''
+RowBatch class
+
+A batch of rows stored column by column, so that an operation on a whole
+column can run once per batch instead of once per row.
+
+Rows of a flat table sharing one Schema are transposed into columns at once.
+Other rows are kept as they are and the columns are built from their flat
+views only when they are requested, so that writers can still write them
+without losing anything (e.g. empty objects).
+'''
+
+from collections import (
+    OrderedDict,
+)
+
+from typing import (
+    Iterable,
+    Iterator,
+)
+
+import pandas as pd
+
+from ..constants import (
+    STAGING_FIELD,
+)
+
+from .compact_row import CompactRow
+from .row import Row
+from .schema import Schema
+
+class Missing:
+    '''
+    Placeholder of a cell which does not exist in the row.
+    '''
+    def __repr__(self):
+        return 'MISSING'
+
+MISSING = Missing()
+
+class RowBatch:
+    def __init__(
+        self,
+        schema: Schema,
+        columns: list[list],
+        size: int | None = None,
+    ):
+        self._schema: Schema | None = schema
+        self._columns: list[list] | None = columns
+        self._rows: list[Row] | None = None
+        if size is None:
+            size = len(columns[0]) if columns else 0
+        self.size = size
+        # NOTE: Some rows do not have some of the columns (MISSING cells)
+        self.has_missing = False
+
+    @staticmethod
+    def from_rows(
+        rows: Iterable[Row],
+    ):
+        rows = list(rows)
+        schema = None
+        for row in rows:
+            compact = row.as_compact() if isinstance(row, CompactRow) else None
+            if compact is None or (schema is not None and compact[0] is not schema):
+                batch = RowBatch(None, None, len(rows))
+                batch._rows = rows
+                return batch
+            schema = compact[0]
+        if schema is None:
+            return RowBatch(Schema(), [], 0)
+        width = len(schema)
+        has_missing = False
+        list_values = []
+        for row in rows:
+            _, values = row.as_compact()
+            if len(values) < width:
+                # NOTE: Short rows of CSV files
+                values = list(values) + [MISSING] * (width - len(values))
+                has_missing = True
+            list_values.append(values)
+        columns = [list(column) for column in zip(*list_values)]
+        if not columns:
+            columns = [[] for _ in range(width)]
+        batch = RowBatch(schema, columns, len(rows))
+        batch.has_missing = has_missing
+        return batch
+
+    @staticmethod
+    def from_dataframe(
+        df: pd.DataFrame,
+    ):
+        schema = Schema([str(column) for column in df.columns])
+        columns = [df[column].tolist() for column in df.columns]
+        return RowBatch(schema, columns, len(df))
+
+    def _ensure_columns(self):
+        if self._columns is not None:
+            return
+        schema = Schema()
+        columns: list[list] = []
+        num_cells = 0
+        for index, row in enumerate(self._rows):
+            for key, value in row.flat.items():
+                column_index = schema.index.get(key)
+                if column_index is None:
+                    schema.add_column(key)
+                    columns.append([MISSING] * self.size)
+                    column_index = len(columns) - 1
+                columns[column_index][index] = value
+                num_cells += 1
+        self._schema = schema
+        self._columns = columns
+        self.has_missing = num_cells < len(columns) * self.size
+
+    @property
+    def is_columnar(self):
+        '''
+        Whether the columns are the canonical representation of the batch.
+        '''
+        return self._rows is None
+
+    @property
+    def schema(self):
+        self._ensure_columns()
+        return self._schema
+
+    @property
+    def columns(self):
+        self._ensure_columns()
+        return self._columns
+
+    def column(
+        self,
+        key: str,
+    ):
+        index = self.schema.index.get(key)
+        if index is None:
+            raise KeyError(f'column not found: {key}')
+        return self._columns[index]
+
+    def set_column(
+        self,
+        key: str,
+        values: list,
+    ):
+        if len(values) != self.size:
+            raise ValueError(
+                f'invalid column size: {len(values)} != {self.size}'
+            )
+        self._ensure_columns()
+        # NOTE: The columns are the only representation from now on
+        self._rows = None
+        index = self._schema.index.get(key)
+        if index is None:
+            self._schema = Schema(self._schema.columns + [key])
+            self._columns.append(list(values))
+        else:
+            self._columns[index] = list(values)
+
+    def pop_column(
+        self,
+        key: str,
+    ):
+        self._ensure_columns()
+        self._rows = None
+        index = self._schema.index.get(key)
+        if index is None:
+            raise KeyError(f'column not found: {key}')
+        columns = list(self._schema.columns)
+        columns.pop(index)
+        self._schema = Schema(columns)
+        return self._columns.pop(index)
+
+    def drop_staging(self):
+        '''
+        Remove the staging fields from all the rows.
+        '''
+        if self._rows is not None:
+            for row in self._rows:
+                if STAGING_FIELD in row:
+                    row.drop_staging()
+            # NOTE: Built again if needed
+            self._schema = None
+            self._columns = None
+            return
+        for key in list(self._schema.columns):
+            if key == STAGING_FIELD or key.startswith(STAGING_FIELD + '.'):
+                self.pop_column(key)
+
+    def iter_values(self) -> Iterator[tuple]:
+        '''
+        Iterate the values of each row in the order of the schema columns.
+        '''
+        columns = self.columns
+        if not columns:
+            return iter([()] * self.size)
+        return zip(*columns)
+
+    def iter_nested(self) -> Iterator[OrderedDict]:
+        if not self.is_columnar or self.has_missing or not self._schema.is_compact:
+            for row in self.iter_rows():
+                yield row.nested
+            return
+        for values in self.iter_values():
+            yield self._schema.build_nested(values)
+
+    def iter_rows(self) -> Iterator[Row]:
+        if self._rows is not None:
+            yield from self._rows
+            return
+        schema = self._schema
+        columns = schema.columns
+        for values in self.iter_values():
+            if self.has_missing and any(value is MISSING for value in values):
+                yield Row.from_dict(OrderedDict(
+                    (key, value)
+                    for key, value in zip(columns, values)
+                    if value is not MISSING
+                ))
+            else:
+                yield Row.from_flat(schema, list(values))
+
+    def to_dataframe(self):
+        schema = self.schema
+        return pd.DataFrame(OrderedDict(
+            (key, [None if value is MISSING else value for value in column])
+            for key, column in zip(schema.columns, self._columns)
+        ))
+
+    def __iter__(self):
+        return self.iter_rows()
+
+    def __len__(self):
+        return self.size
+
+    def __repr__(self):
+        if self._rows is not None:
+            return f'RowBatch(size={self.size}, rows=...)'
+        return f'RowBatch(size={self.size}, columns={self._schema.columns})'
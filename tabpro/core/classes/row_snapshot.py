@@ -0,0 +1,81 @@
+'''
+RowSnapshot class
+
+Read-only view of the values of a row at some point, used as the input
+field of the staging area. It keeps a reference to the original values
+instead of a copy, and the row takes care not to modify them in place.
+'''
+
+from collections import (
+    OrderedDict,
+)
+
+from ..constants import (
+    VALUES_FIELD,
+)
+
+from .field_path import FieldPath
+from .schema import Schema
+
+from ..functions.flatten_row import flatten_row
+from ..functions.get_nested_field_value import get_nested_field_value
+
+class RowSnapshot:
+    __slots__ = (
+        '_nested',
+        '_schema',
+        '_values',
+        '_positional',
+        'with_values',
+    )
+
+    def __init__(
+        self,
+        nested: OrderedDict | None = None,
+        schema: Schema | None = None,
+        values: list | None = None,
+        with_values: bool = False,
+    ):
+        self._nested = nested
+        self._schema = schema
+        self._values = values
+        self._positional: OrderedDict | None = None
+        # NOTE: Expose the values by their positions as well (__values__.N)
+        self.with_values = with_values
+
+    @property
+    def nested(self):
+        if self._nested is None:
+            self._nested = self._schema.build_nested(self._values)
+        return self._nested
+
+    @property
+    def positional(self):
+        if self._positional is None:
+            if self._nested is None and self._schema.is_flat:
+                values = self._values
+            else:
+                values = flatten_row(self.nested).values()
+            self._positional = OrderedDict(
+                (str(index), value) for index, value in enumerate(values)
+            )
+        return self._positional
+
+    def lookup(
+        self,
+        path: FieldPath,
+    ):
+        if self.with_values and path.segments[0] == VALUES_FIELD:
+            if len(path.segments) == 1:
+                return self.positional, True
+            return get_nested_field_value(self.positional, path.rests[1])
+        if self._nested is None:
+            schema = self._schema
+            index = schema.index.get(path)
+            if index is not None:
+                if index < len(self._values):
+                    return self._values[index], True
+                return None, False
+            if path.segments[0] not in schema.roots:
+                return None, False
+        return get_nested_field_value(self.nested, path)
@@ -0,0 +1,82 @@
+'''
+Schema class
+
+Column layout shared by all the rows of a flat table (CSV, Excel, etc.),
+so that each row only needs to keep its own list of values.
+'''
+
+from collections import (
+    OrderedDict,
+)
+
+from .field_path import FieldPath
+
+from ..functions.set_nested_field_value import set_nested_field_value
+
+class Schema:
+    def __init__(
+        self,
+        columns: list[str] | None = None,
+    ):
+        self.columns: list[str] = []
+        self.index: dict[str, int] = {}
+        # NOTE: First segments of the columns, to reject missing keys quickly
+        self.roots: set[str] = set()
+        self.prefixes: set[str] = set()
+        # NOTE: No column contains a dot, so rows are already nested
+        self.is_flat: bool = True
+        # NOTE: No duplicate or overlapping columns, so compact rows can be used
+        self.is_compact: bool = True
+        if columns:
+            for column in columns:
+                self.add_column(column)
+
+    def add_column(
+        self,
+        column: str,
+    ):
+        path = FieldPath.of(column)
+        if column in self.index or column in self.prefixes:
+            self.is_compact = False
+        for depth in range(1, len(path.segments)):
+            prefix = '.'.join(path.segments[:depth])
+            if prefix in self.index:
+                self.is_compact = False
+            self.prefixes.add(prefix)
+        if len(path.segments) > 1:
+            self.is_flat = False
+        self.index.setdefault(column, len(self.columns))
+        self.columns.append(column)
+        self.roots.add(path.segments[0])
+        return self
+
+    def ensure_width(
+        self,
+        width: int,
+    ):
+        '''
+        Extend the schema with positional columns for header-less tables.
+        '''
+        for index in range(len(self.columns), width):
+            self.add_column(f'{index}')
+        return self
+
+    def build_nested(
+        self,
+        values: list,
+    ):
+        '''
+        Build the nested representation of a row with this layout.
+        '''
+        if self.is_flat:
+            return OrderedDict(zip(self.columns, values))
+        nested = OrderedDict()
+        for key, value in zip(self.columns, values):
+            set_nested_field_value(nested, key, value)
+        return nested
+
+    def __len__(self):
+        return len(self.columns)
+
+    def __repr__(self):
+        return f'Schema(columns={self.columns})'
@@ -87,10 +87,9 @@ def compare(
     num_modified = 0
     if output_path:
         check_writer(output_path)
-    loaders = [get_loader(path) for path in [path1, path2]]
+    loaders = [get_loader(path, streaming=True) for path in [path1, path2]]
     for loader_index, loader in enumerate(loaders):
         console.log('loading file: ', [path1, path2][loader_index])
-        console.log('# rows: ', len(loader))
         dict_key_to_row = list_dict_key_to_row[loader_index] = {}
         for row_index, row in enumerate(loader):
             query_value = get_primary_key(row, query_keys)
@@ -100,6 +99,7 @@ def compare(
                 )
             dict_key_to_row[query_value] = row
             set_query_values.add(query_value)
+        console.log('# rows: ', loader.num_rows)
     diff_rows: list[Row] = []
     for query_value in sorted(set_query_values):
         row1 = list_dict_key_to_row[0].get(query_value)
@@ -3,3 +3,4 @@ ROW_INDEX_FIELD = '__row_index__'
 FILE_ROW_INDEX_FIELD = '__file_row_index__'
 INPUT_FIELD = '__input__'
 STAGING_FIELD = '__staging__'
+VALUES_FIELD = '__values__'
@@ -21,12 +21,12 @@ from . constants import (
     FILE_FIELD,
     ROW_INDEX_FIELD,
     FILE_ROW_INDEX_FIELD,
-    INPUT_FIELD,
     STAGING_FIELD,
 )
 
 from .actions import (
     do_actions,
+    get_source_columns,
     remap_columns,
     setup_actions_with_args,
 )
@@ -36,12 +36,30 @@ from .actions.types import (
 )
 
 from . io import (
-    get_loader,
+    MultiLoader,
     get_writer,
 )
+from . io.prefetch import DEFAULT_PREFETCH_BATCHES
 
 from . console.views import Panel
 
+def get_ignored_rows(
+    set_ignore_file_rows: set[str],
+    input_file: str,
+):
+    '''
+    Indices of the rows of the input file given as "file:index".
+    '''
+    ignored_rows = set()
+    base_name = os.path.basename(input_file)
+    for file_row_index in set_ignore_file_rows:
+        file, _, index = file_row_index.rpartition(':')
+        if file not in [input_file, base_name]:
+            continue
+        if index.isdecimal() and str(int(index)) == index:
+            ignored_rows.add(int(index))
+    return ignored_rows
+
 def convert(
     input_files: list[str],
     output_file: str | None = None,
@@ -54,6 +72,10 @@ def convert(
     verbose: bool = False,
     ignore_file_rows: list[str] | None = None,
     no_header: bool = False,
+    table: str | None = None,
+    query: str | None = None,
+    ordered: bool = True,
+    prefetch: bool = False,
 ):
     #console = Console()
     progress = Progress(
@@ -64,7 +86,7 @@ def convert(
     #ic.enable()
     console = progress.console
     logger.info('input_files: %s', input_files)
-    row_list_filtered_out = []
+    writer_filtered_out = None
     set_ignore_file_rows = set()
     global_status = GlobalStatus()
     config = setup_config(config_path)
@@ -80,49 +102,80 @@ def convert(
             action_delimiter=action_delimiter,
         )
     writer = None
+    # NOTE: Both the output files are written concurrently
+    background_writing = bool(output_file and output_file_filtered_out)
     if output_file:
         writer = get_writer(
             output_file,
             progress=progress,
+            background_writing=background_writing,
         )
     num_stacked_rows = 0
-    for input_file in input_files:
-        if not os.path.exists(input_file):
-            raise FileNotFoundError(f'File not found: {input_file}')
-        base_name = os.path.basename(input_file)
-        loader = get_loader(
-            input_file,
-            no_header=no_header,
-            progress=progress,
+    # NOTE: Rows are written in batches when nothing is done for each row
+    use_batches = all([
+        writer is not None,
+        not config.actions,
+        not config.pick,
+        not output_debug,
+        not set_ignore_file_rows,
+    ])
+    columns = None
+    if config.pick and not config.actions and not output_debug:
+        # NOTE: Other columns are dropped with the staging fields anyway,
+        #       so they are not loaded if the format can skip them
+        columns = get_source_columns(config.pick)
+    for loader in MultiLoader(
+        input_files,
+        ordered=ordered,
+        progress=progress,
+        no_header=no_header,
+        table=table,
+        query=query,
+        columns=columns,
+        prefetch=DEFAULT_PREFETCH_BATCHES if prefetch else 0,
+    ):
+        input_file = loader.source
+        if use_batches:
+            for batch in loader.iter_batches():
+                batch.drop_staging()
+                writer.push_batch(batch)
+                num_stacked_rows += len(batch)
+            console.log('# rows: ', loader.num_rows)
+            continue
+        # NOTE: The ignored rows are not even decoded if the format can
+        #       skip them (e.g. JSONL)
+        rows = loader.iter_indexed(
+            skip_rows=get_ignored_rows(set_ignore_file_rows, input_file),
         )
-        console.log('# rows: ', len(loader))
-        for index, row in enumerate(loader):
+        for index, row in rows:
             file_row_index = f'{input_file}:{index}'
-            if file_row_index in set_ignore_file_rows:
-                continue
-            short_file_row_index = f'{base_name}:{index}'
-            if short_file_row_index in set_ignore_file_rows:
-                continue
-            orig_row = row.clone()
             if STAGING_FIELD not in row:
+                # NOTE: The input field is built only when it is needed
+                snapshot = row.snapshot(
+                    with_values = loader.extension in ['.csv', '.tsv', '.psv', '.xlsx'] and not no_header,
+                )
                 row.staging[FILE_FIELD] = input_file
                 row.staging[FILE_ROW_INDEX_FIELD] = file_row_index
                 row.staging[ROW_INDEX_FIELD] = index
-                row.staging[INPUT_FIELD] = orig_row.nested
-                if loader.extension in ['.csv', '.xlsx'] and not no_header:
-                    for key_index, (key, value) in enumerate(orig_row.flat.items()):
-                        row.staging[f'{INPUT_FIELD}.__values__.{key_index}'] = value
+                row.attach_input(snapshot)
             if config.actions:
                 try:
                     new_row = do_actions(global_status, row, config.actions)
                     if new_row is None:
                         if not output_debug:
-                            row.pop_staging()
+                            row.drop_staging()
                         if verbose:
                             #ic('Filtered out: ', row.flat)
                             console.log('filtered out: ', row.flat)
                         if output_file_filtered_out:
-                            row_list_filtered_out.append(row.flat)
+                            if writer_filtered_out is None:
+                                console.log('saving filtered out to: ', output_file_filtered_out)
+                                writer_filtered_out = get_writer(
+                                    output_file_filtered_out,
+                                    progress=progress,
+                                    background_writing=background_writing,
+                                )
+                            writer_filtered_out.push_row(row)
                         continue
                     row = new_row
                 except Exception as e:
@@ -145,26 +198,18 @@ def convert(
                             )
                         )
             if not output_debug:
-                row.pop_staging()
+                row.drop_staging()
             if writer:
                 writer.push_row(row)
             else:
                 pass
             num_stacked_rows += 1
+        console.log('# rows: ', loader.num_rows)
     console.log('total processed input rows: ', num_stacked_rows)
     if writer:
         writer.close()
     #else:
     #    ic(all_df)
-    if row_list_filtered_out:
-        #df_filtered_out = pd.DataFrame(row_list_filtered_out)
-        #ic('Saving filtered out to: ', output_file_filtered_out)
-        if output_file_filtered_out:
-            console.log('saving filtered out to: ', output_file_filtered_out)
-            writer = get_writer(
-                output_file_filtered_out,
-                progress=progress,
-            )
-            writer.push_rows(row_list_filtered_out)
-            writer.close()
+    if writer_filtered_out:
+        writer_filtered_out.close()
     progress.stop()
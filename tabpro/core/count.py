@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+import os
+
+# 3-rd party modules
+
+from rich.console import Console
+
+# local
+
+from .io import (
+    get_loader,
+)
+
+def count(
+    input_files: list[str],
+    no_header: bool = False,
+    table: str | None = None,
+    query: str | None = None,
+    load: bool = False,
+    verbose: bool = False,
+):
+    '''
+    Print the number of the rows of each input file (and the total).
+    The rows are counted without being built unless load=True or the format
+    does not support it.
+    '''
+    console = Console(stderr=True)
+    console.log('input_files: ', input_files)
+    num_total_rows = 0
+    for input_file in input_files:
+        if not os.path.exists(input_file):
+            raise FileNotFoundError(f'File not found: {input_file}')
+        loader = get_loader(
+            input_file,
+            quiet=True,
+            no_header=no_header,
+            table=table,
+            query=query,
+            streaming=True,
+        )
+        if load:
+            num_rows = len(loader)
+        else:
+            num_rows = loader.count()
+        num_total_rows += num_rows
+        print(f'{num_rows}\t{input_file}')
+    if len(input_files) > 1:
+        print(f'{num_total_rows}\ttotal')
+    return num_total_rows
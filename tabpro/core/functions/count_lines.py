@@ -0,0 +1,60 @@
+'''
+Count the lines of a text file without decoding it.
+'''
+
+from ..io.compression import open_file
+
+COUNT_CHUNK_SIZE = 1 << 20
+
+def _count_line_breaks(
+    data: bytes,
+):
+    # NOTE: Same as the universal newlines mode of open() (\n, \r\n and \r)
+    return data.count(b'\n') + data.count(b'\r') - data.count(b'\r\n')
+
+def count_lines(
+    input_file: str,
+    quoted: bool = False,
+    chunk_size: int = COUNT_CHUNK_SIZE,
+):
+    '''
+    Count the lines as the text mode of open() splits them.
+    With quoted=True, line breaks between double quotes are not counted,
+    which is the number of the records read by csv.reader as long as the
+    double quotes are used only for quoting fields.
+    '''
+    num_lines = 0
+    in_quotes = False
+    last = b''
+    with open_file(input_file, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            while chunk.endswith(b'\r'):
+                # NOTE: Not to count \r\n split between the chunks twice
+                extra = f.read(1)
+                if not extra:
+                    break
+                chunk += extra
+            last = chunk[-1:]
+            if not quoted:
+                num_lines += _count_line_breaks(chunk)
+                continue
+            if not in_quotes and b'"' not in chunk:
+                num_lines += _count_line_breaks(chunk)
+                continue
+            # NOTE: Escaped quotes ("") toggle the state twice
+            parts = chunk.split(b'"')
+            start = 1 if in_quotes else 0
+            for part in parts[start::2]:
+                num_lines += _count_line_breaks(part)
+            if (len(parts) - 1) % 2 == 1:
+                in_quotes = not in_quotes
+            if in_quotes:
+                # NOTE: The last record continues until the closing quote
+                last = b'"'
+    if last and last not in (b'\n', b'\r'):
+        # NOTE: The last line without a line break
+        num_lines += 1
+    return num_lines
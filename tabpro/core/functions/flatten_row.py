@@ -10,13 +10,13 @@ type FieldMap = Mapping[str, str|FieldMap]
 
 def flatten_row(
     mapping: FieldMap,
-    parent_key: str = '',
+    parent_key: str | None = None,
     new_mapping: FlatFieldMap | None = None,
 ) -> FlatFieldMap:
     if new_mapping is None:
         new_mapping = OrderedDict()
     for key, mapped in mapping.items():
-        new_key = f'{parent_key}.{key}' if parent_key else key
+        new_key = f'{parent_key}.{key}' if parent_key is not None else key
         if isinstance(mapped, Mapping):
             flatten_row(mapped, new_key, new_mapping)
         else:
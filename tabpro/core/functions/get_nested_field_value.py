@@ -2,44 +2,35 @@
 
 from collections import OrderedDict
 
-from icecream import ic
+from ..classes.field_path import FieldPath
 
 def get_nested_field_value(
     data: OrderedDict | list,
-    #field: str,
-    field: str | int,
+    field: str | int | FieldPath,
 ):
-    if isinstance(data, list):
-        #ic(data, field)
-        if field.isdigit():
-            index = int(field)
-            if index < len(data):
-                return data[index], True
-            return None, False
-        if '.' in field:
-            field, rest = field.split('.', 1)
-            if field.isdigit():
-                index = int(field)
-                if index < len(data):
-                    return get_nested_field_value(data[index], rest)
     if isinstance(data, dict):
         if field in data:
             return data[field], True
-        if isinstance(field, int):
-            if field in data:
-                return data[field], True
-            str_field = str(field)
-            if str_field in data:
-                return data[str_field], True
-        elif isinstance(field, str):
-            if field.isdigit():
-                index = int(field)
-                if index in data:
+    if type(field) is not FieldPath:
+        field = FieldPath.of(field)
+    for segment, index, rest, is_last in field.steps:
+        if isinstance(data, dict):
+            # NOTE: The remaining path may be a key containing dots
+            if rest in data:
+                return data[rest], True
+            if is_last:
+                if index is not None and index in data:
                     return data[index], True
-            if '.' in field:
-                field, rest = field.split('.', 1)
-                if field in data:
-                    return get_nested_field_value(data[field], rest)
+                return None, False
+            if segment not in data:
+                return None, False
+            data = data[segment]
+        elif isinstance(data, list):
+            if index is None or index >= len(data):
+                return None, False
+            if is_last:
+                return data[index], True
+            data = data[index]
         else:
-            raise TypeError(f'unsupported field type: {type(field)}')
+            return None, False
     return None, False
@@ -9,17 +9,25 @@ from .. constants import (
 
 from collections import OrderedDict
 
+from ..classes.field_path import FieldPath
+
 from . get_nested_field_value import get_nested_field_value
 
+def get_search_paths(
+    column: str | FieldPath,
+):
+    path = FieldPath.of(column)
+    return [
+        path.with_prefix(STAGING_FIELD),
+        path,
+        path.with_prefix(f'{STAGING_FIELD}.{INPUT_FIELD}'),
+    ]
+
 def search_column_value(
     row: OrderedDict,
-    column: str,
+    column: str | FieldPath,
 ):
-    for key in [
-        f'{STAGING_FIELD}.{column}',
-        column,
-        f'{STAGING_FIELD}.{INPUT_FIELD}.{column}',
-    ]:
+    for key in get_search_paths(column):
         value, found = get_nested_field_value(row, key)
         if found:
             return value, key
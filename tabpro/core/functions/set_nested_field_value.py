@@ -5,37 +5,42 @@ Set the value of a field in a nested dictionary.
 from collections import OrderedDict
 from icecream import ic
 
+from ..classes.field_path import FieldPath
+
 def set_nested_field_value(
     data: OrderedDict | list,
-    field: str,
+    field: str | FieldPath,
     value: any,
 ):
-    if isinstance(field, str) and  '.' in field:
-        field, rest = field.split('.', 1)
+    if type(field) is not FieldPath:
+        field = FieldPath.of(field)
+    steps = field.steps
+    for depth in range(len(steps) - 1):
+        key, index, _, _ = steps[depth]
         if isinstance(data, dict):
-            sub_data = data.get(field)
+            sub_data = data.get(key)
         elif isinstance(data, list):
-            field = int(field)
-            if field < len(data):
-                sub_data = data[field]
+            key = int(key)
+            if key < len(data):
+                sub_data = data[key]
             else:
                 sub_data = None
         if not isinstance(sub_data, dict):
             do_create_dict = True
             if isinstance(sub_data, list):
                 # NOTE: 続くフィールド文字列が数字の場合は、リストの要素として扱う
-                field2 = rest.split('.', 1)[0]
-                if field2.isdigit():
+                if steps[depth + 1][1] is not None:
                     do_create_dict = False
             if do_create_dict:
-                data[field] = OrderedDict()
-        set_nested_field_value(data[field], rest, value)
-    else:
-        try:
-            if isinstance(data, dict):
-                data[field] = value
-            elif isinstance(data, list):
-                data[int(field)] = value
-        except:
-            ic(data, field, value)
-            raise
+                sub_data = OrderedDict()
+                data[key] = sub_data
+        data = sub_data
+    key = steps[-1][0]
+    try:
+        if isinstance(data, dict):
+            data[key] = value
+        elif isinstance(data, list):
+            data[int(key)] = value
+    except:
+        ic(data, key, value)
+        raise
@@ -1,5 +1,5 @@
 '''
-Set a value in a row, both in the flat and nested representations.
+Set a value in a row.
 '''
 
 from typing import Any
@@ -8,9 +8,6 @@ from .. constants import (
     STAGING_FIELD,
 )
 
-from . set_flat_field_value import set_flat_field_value
-from . set_nested_field_value import set_nested_field_value
-
 from ..actions.types import (
     Row,
 )
@@ -20,8 +17,7 @@ def set_row_value(
     target: str,
     value: Any,
 ):
-    set_flat_field_value(row.flat, target, value)
-    set_nested_field_value(row.nested, target, value)
+    row[target] = value
     return row
 
 def set_row_staging_value(
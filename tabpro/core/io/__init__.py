@@ -1,23 +1,51 @@
+from . extensions import io_arrow
 from . extensions import io_csv
 from . extensions import io_excel
 from . extensions import io_json
 from . extensions import io_jsonl
+from . extensions import io_sqlite
 
+from . compression import (
+    get_extension,
+    open_file,
+)
+from . json_codec import (
+    get_json_codec,
+    set_json_codec,
+)
 from . loader import Loader
+from . multi_loader import (
+    MultiLoader,
+    expand_input_files,
+)
+from . parallel import (
+    get_num_workers,
+    set_num_workers,
+)
 from . extensions.manage_writers import (
     BaseWriter as Writer,
     check_writer,
     get_writer,
     save,
+    save_all,
 )
 
 get_loader = Loader
 
 __all__ = [
     'Loader',
+    'MultiLoader',
     'Writer',
     'check_writer',
+    'expand_input_files',
+    'get_extension',
+    'get_json_codec',
     'get_loader',
+    'get_num_workers',
     'get_writer',
+    'open_file',
     'save',
+    'save_all',
+    'set_json_codec',
+    'set_num_workers',
 ]
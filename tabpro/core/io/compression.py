@@ -0,0 +1,172 @@
+'''
+Transparent compression of the input and output files
+
+A compression suffix (e.g. ".gz" of "data.jsonl.gz") is recognized in front
+of the extension of the format, and the file is streamed through the codec
+of the standard library with large buffers.
+'''
+
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+
+from typing import (
+    IO,
+    Callable,
+)
+
+BUFFER_SIZE = 1 << 20
+
+# NOTE: Maximum number of the buffers waiting for the background thread
+MAX_PENDING_BUFFERS = 16
+
+def _open_gzip(fobj: IO[bytes], mode: str):
+    # NOTE: Same level as the gzip command, much faster than the default 9
+    return gzip.GzipFile(fileobj=fobj, mode=mode, compresslevel=6)
+
+def _open_bz2(fobj: IO[bytes], mode: str):
+    return bz2.BZ2File(fobj, mode=mode)
+
+def _open_xz(fobj: IO[bytes], mode: str):
+    return lzma.LZMAFile(fobj, mode=mode)
+
+dict_compressions: dict[str, Callable[[IO[bytes], str], IO[bytes]]] = {
+    '.gz': _open_gzip,
+    '.bz2': _open_bz2,
+    '.xz': _open_xz,
+}
+
+def get_compression(
+    path: str,
+):
+    '''
+    The compression suffix of the path, or None.
+    '''
+    ext = os.path.splitext(path)[1]
+    if ext in dict_compressions:
+        return ext
+    return None
+
+def get_extension(
+    path: str,
+):
+    '''
+    The extension of the format, ignoring the compression suffix.
+    '''
+    root, ext = os.path.splitext(path)
+    if ext in dict_compressions:
+        return os.path.splitext(root)[1]
+    return ext
+
+class BackgroundWriter(io.RawIOBase):
+    '''
+    Binary stream writing into the underlying stream in a background thread,
+    so that the compression (which releases the GIL) overlaps with the
+    processing of the rows.
+    '''
+    def __init__(
+        self,
+        fobj: IO[bytes],
+    ):
+        super().__init__()
+        self.fobj = fobj
+        self.queue: queue.Queue[bytes | None] = queue.Queue(MAX_PENDING_BUFFERS)
+        self.error: BaseException | None = None
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            data = self.queue.get()
+            if data is None:
+                break
+            if self.error is not None:
+                # NOTE: Consumed anyway not to block the writing thread
+                continue
+            try:
+                self.fobj.write(data)
+            except BaseException as e:
+                self.error = e
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.error is not None:
+            raise self.error
+        # NOTE: Copied as the buffer might be reused by the caller
+        self.queue.put(bytes(data))
+        return len(data)
+
+    def close(self):
+        if self.closed:
+            return
+        self.queue.put(None)
+        self.thread.join()
+        try:
+            self.fobj.close()
+        finally:
+            super().close()
+        if self.error is not None:
+            raise self.error
+
+class _ClosingReader(io.BufferedReader):
+    def __init__(self, stream, buffer_size, fobj):
+        super().__init__(stream, buffer_size)
+        self._fobj = fobj
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            # NOTE: The codecs do not close the file objects passed to them
+            self._fobj.close()
+
+class _ClosingWriter(io.BufferedWriter):
+    def __init__(self, stream, buffer_size, fobj):
+        super().__init__(stream, buffer_size)
+        self._fobj = fobj
+
+    def close(self):
+        try:
+            super().close()
+        finally:
+            self._fobj.close()
+
+def open_file(
+    path: str,
+    mode: str = 'r',
+    encoding: str | None = None,
+    newline: str | None = None,
+    fn_open: Callable[..., IO] = open,
+    background: bool | None = None,
+) -> IO:
+    '''
+    Open the file in the mode ("r", "w", "rb" or "wb"), decompressing or
+    compressing it by the suffix of the path. With background=True, the
+    compression is done in a background thread (by default, only when
+    another CPU can run it).
+    '''
+    compression = get_compression(path)
+    if compression is None:
+        if 'b' in mode:
+            return fn_open(path, mode)
+        return fn_open(path, mode, encoding=encoding, newline=newline)
+    writing = 'w' in mode
+    fobj = fn_open(path, 'wb' if writing else 'rb')
+    stream = dict_compressions[compression](fobj, 'wb' if writing else 'rb')
+    if writing:
+        if background is None:
+            background = (os.cpu_count() or 1) > 1
+        if background:
+            stream = BackgroundWriter(stream)
+        buffered = _ClosingWriter(stream, BUFFER_SIZE, fobj)
+    else:
+        buffered = _ClosingReader(stream, BUFFER_SIZE, fobj)
+    if 'b' in mode:
+        return buffered
+    return io.TextIOWrapper(buffered, encoding=encoding, newline=newline)
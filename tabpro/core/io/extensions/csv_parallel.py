@@ -0,0 +1,177 @@
+'''
+Parallel CSV parsing
+
+The file is split into chunks at the line breaks outside double quotes, and
+the chunks are parsed in a process pool. The records are yielded in the
+original order.
+
+Splitting by the parity of the quotes is exact as long as they are used
+only for quoting fields. Each chunk is checked to end at the end of a
+record, and the rest of the file is parsed serially otherwise.
+'''
+
+import codecs
+import csv
+import io
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from typing import (
+    IO,
+    Any,
+)
+
+from .. compression import open_file
+
+from . csv_reader import fast_csv_reader
+from .. parallel import get_mp_context
+
+CSV_CHUNK_SIZE = 8 << 20
+
+# NOTE: Record appended to each chunk, parsed as it is only at a record start
+CHUNK_SENTINEL = 'tabpro-chunk-end'
+
+def get_split_quote(
+    encoding: str,
+    params: dict[str, Any],
+) -> bytes | None:
+    '''
+    The quote character to split the file by its parity (b'' if the quotes
+    are not special), or None if the file can not be split.
+    '''
+    if codecs.lookup(encoding).name not in ['utf-8', 'utf-8-sig']:
+        # NOTE: Line breaks and quotes might be a part of other characters
+        return None
+    if params.get('escapechar'):
+        return None
+    quoting = params.get('quoting', csv.QUOTE_MINIMAL)
+    if quoting == csv.QUOTE_NONNUMERIC:
+        # NOTE: The sentinel record would be converted into a number
+        return None
+    if quoting == csv.QUOTE_NONE:
+        return b''
+    quotechar = params.get('quotechar', '"')
+    if not quotechar.isascii():
+        return None
+    return quotechar.encode('ascii')
+
+def _find_record_end(
+    data: bytes,
+    quote: bytes,
+):
+    '''
+    Position after the last line feed outside quotes, or -1.
+    The data should start at the start of a record.
+    '''
+    pos = data.rfind(b'\n')
+    if pos < 0:
+        return -1
+    if not quote:
+        return pos + 1
+    num_quotes = data.count(quote, 0, pos)
+    while num_quotes % 2 == 1:
+        prev = data.rfind(b'\n', 0, pos)
+        if prev < 0:
+            return -1
+        num_quotes -= data.count(quote, prev, pos)
+        pos = prev
+    return pos + 1
+
+def iter_csv_chunks(
+    f: IO[bytes],
+    quote: bytes = b'"',
+    chunk_size: int = CSV_CHUNK_SIZE,
+):
+    buffer = b''
+    while True:
+        data = f.read(chunk_size)
+        if not data:
+            break
+        buffer += data
+        end = _find_record_end(buffer, quote)
+        if end <= 0:
+            # NOTE: A record longer than the chunk
+            continue
+        yield buffer[:end]
+        buffer = buffer[end:]
+    if buffer:
+        yield buffer
+
+def parse_csv_chunk(
+    data: bytes,
+    encoding: str,
+    params: dict[str, Any],
+):
+    '''
+    Parse the records of a chunk, or None if the chunk does not end at the
+    end of a record.
+    '''
+    text = data.decode(encoding)
+    if not text.endswith(('\n', '\r')):
+        text += '\n'
+    # NOTE: Universal newlines as the text mode of open()
+    lines = io.StringIO(text + CHUNK_SENTINEL, newline=None)
+    records = list(fast_csv_reader(lines, **params))
+    if not records or records[-1] != [CHUNK_SENTINEL]:
+        return None
+    records.pop()
+    return records
+
+def iter_csv_records(
+    input_file: str,
+    encoding: str,
+    num_workers: int,
+    params: dict[str, Any] | None = None,
+    chunk_size: int = CSV_CHUNK_SIZE,
+):
+    '''
+    Iterate the records of the CSV file parsed in a process pool.
+    The file should be splittable with get_split_quote.
+    '''
+    params = params or {}
+    quote = get_split_quote(encoding, params)
+    assert quote is not None
+    num_records = 0
+    aligned = True
+    # NOTE: The BOM is only at the start of the file
+    chunk_encoding = encoding
+    if codecs.lookup(encoding).name == 'utf-8-sig':
+        chunk_encoding = 'utf-8'
+    executor = ProcessPoolExecutor(num_workers, mp_context=get_mp_context())
+    try:
+        with open_file(input_file, 'rb') as f:
+            pending = deque()
+            chunks = iter_csv_chunks(f, quote, chunk_size)
+            for index, chunk in enumerate(chunks):
+                pending.append(executor.submit(
+                    parse_csv_chunk,
+                    chunk,
+                    encoding if index == 0 else chunk_encoding,
+                    params,
+                ))
+                # NOTE: Bounded not to read the whole file ahead
+                if len(pending) < 2 * num_workers:
+                    continue
+                records = pending.popleft().result()
+                if records is None:
+                    aligned = False
+                    break
+                num_records += len(records)
+                yield from records
+            while aligned and pending:
+                records = pending.popleft().result()
+                if records is None:
+                    aligned = False
+                    break
+                num_records += len(records)
+                yield from records
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+    if aligned:
+        return
+    # NOTE: e.g. A double quote in a field which is not quoted
+    with open_file(input_file, 'r', encoding=encoding) as f:
+        for index, record in enumerate(fast_csv_reader(f, **params)):
+            if index >= num_records:
+                yield record
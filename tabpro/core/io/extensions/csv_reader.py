@@ -0,0 +1,113 @@
+'''
+CSV reader with a fast path for the lines without quotes
+
+Such lines are split by str.split instead of the state machine of csv.reader,
+which gives the same fields. Once a quote (or an escape) character is found,
+the rest of the lines are parsed by csv.reader.
+'''
+
+import csv
+import itertools
+
+from typing import (
+    Any,
+    Iterable,
+    Iterator,
+)
+
+# NOTE: Number of the characters sniffed before trying the fast path
+SNIFF_SIZE = 1 << 16
+
+# NOTE: Delimiters of the extensions of the delimited text files
+DELIMITERS = {
+    '.csv': ',',
+    '.tsv': '\t',
+    '.psv': '|',
+}
+
+QUOTING = {
+    'minimal': csv.QUOTE_MINIMAL,
+    'all': csv.QUOTE_ALL,
+    'nonnumeric': csv.QUOTE_NONNUMERIC,
+    'none': csv.QUOTE_NONE,
+}
+
+DIALECT_KEYS = [
+    'delimiter',
+    'quotechar',
+    'escapechar',
+    'quoting',
+    'doublequote',
+    'skipinitialspace',
+    'lineterminator',
+]
+
+def get_csv_dialect(
+    extension: str,
+    dialect: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    '''
+    Format parameters of the csv module for the extension, overridden by
+    the dialect (e.g. {"delimiter": ";", "quoting": "none"}).
+    '''
+    params: dict[str, Any] = {
+        'delimiter': DELIMITERS.get(extension, ','),
+    }
+    for key, value in (dialect or {}).items():
+        if key not in DIALECT_KEYS:
+            raise ValueError(f'Unsupported CSV dialect option: {key}')
+        if key == 'quoting' and isinstance(value, str):
+            if value.lower() not in QUOTING:
+                raise ValueError(f'Unsupported CSV quoting: {value}')
+            value = QUOTING[value.lower()]
+        params[key] = value
+    try:
+        csv.reader([], **params)
+    except (TypeError, csv.Error) as e:
+        raise ValueError(f'Invalid CSV dialect: {dialect}: {e}')
+    return params
+
+def fast_csv_reader(
+    lines: Iterable[str],
+    **params: Any,
+) -> Iterator[list[str]]:
+    '''
+    Iterate the records of the lines read in universal newlines mode,
+    same as csv.reader(lines, **params).
+    '''
+    lines = iter(lines)
+    quoting = params.get('quoting', csv.QUOTE_MINIMAL)
+    if quoting == csv.QUOTE_NONNUMERIC or params.get('skipinitialspace'):
+        # NOTE: The unquoted fields are not kept as they are
+        yield from csv.reader(lines, **params)
+        return
+    delimiter = params.get('delimiter', ',')
+    quotechar = params.get('quotechar', '"')
+    if quoting == csv.QUOTE_NONE:
+        quotechar = None
+    escapechar = params.get('escapechar')
+    sample: list[str] = []
+    sample_size = 0
+    for line in lines:
+        sample.append(line)
+        if (quotechar and quotechar in line) or \
+                (escapechar and escapechar in line):
+            # NOTE: Quoted CSV, not worth checking every line
+            yield from csv.reader(itertools.chain(sample, lines), **params)
+            return
+        sample_size += len(line)
+        if sample_size >= SNIFF_SIZE:
+            break
+    lines = itertools.chain(sample, lines)
+    for line in lines:
+        if (quotechar and quotechar in line) or \
+                (escapechar and escapechar in line):
+            yield from csv.reader(itertools.chain([line], lines), **params)
+            return
+        if line.endswith('\n'):
+            line = line[:-1]
+        if line:
+            yield line.split(delimiter)
+        else:
+            # NOTE: csv.reader gives no fields for an empty line
+            yield []
@@ -0,0 +1,310 @@
+'''
+Parquet and Arrow (Feather) files
+
+pyarrow is an optional dependency (pip install "tabpro[arrow]"), imported
+only when these files are loaded or written. The nested fields of the rows
+are mapped into the struct columns.
+
+The schema of a written file is inferred from the first batch of the rows and
+widened when later rows add columns or need wider types (e.g. int to float),
+rewriting the batches already written in the file.
+'''
+
+import os
+
+from typing import (
+    Any,
+)
+
+from rich.console import Console
+
+from . manage_loaders import (
+    Row,
+    register_counter,
+    register_loader,
+)
+from ... classes.schema import Schema
+from . manage_writers import (
+    BaseWriter,
+    register_writer,
+)
+
+from ... progress import (
+    Progress,
+    track,
+)
+
+from .. compression import (
+    get_compression,
+    get_extension,
+)
+
+# NOTE: Number of the rows converted into the columns at once
+ARROW_BATCH_SIZE = 16384
+
+def import_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ValueError(
+            'pyarrow is required for Parquet and Arrow files: ' +
+            'pip install "tabpro[arrow]"'
+        ) from e
+    return pyarrow
+
+def check_uncompressed(
+    path: str,
+):
+    # NOTE: The columns are compressed in the files by themselves
+    if get_compression(path):
+        raise ValueError(
+            f'Compressed Parquet or Arrow files are not supported: {path}'
+        )
+
+def select_columns(
+    names: list[str],
+    columns: list[str] | None,
+):
+    '''
+    The names in the file which are referenced by the columns, or None for
+    all of them.
+    '''
+    if columns is None:
+        return None
+    referenced = set(columns)
+    selected = [name for name in names if name in referenced]
+    # NOTE: All the columns are loaded if none of them are referenced,
+    #       not to lose the rows
+    return selected or None
+
+def iter_arrow_batches(
+    input_file: str,
+    columns: list[str] | None = None,
+):
+    pa = import_pyarrow()
+    check_uncompressed(input_file)
+    if get_extension(input_file) == '.parquet':
+        with pa.parquet.ParquetFile(input_file) as parquet_file:
+            names = parquet_file.schema_arrow.names
+            yield from parquet_file.iter_batches(
+                batch_size = ARROW_BATCH_SIZE,
+                columns = select_columns(names, columns),
+            )
+        return
+    with pa.memory_map(input_file) as source:
+        reader = pa.ipc.open_file(source)
+        selected = select_columns(reader.schema.names, columns)
+        for i in range(reader.num_record_batches):
+            batch = reader.get_batch(i)
+            if selected is not None:
+                batch = batch.select(selected)
+            yield batch
+
+@register_loader('.parquet')
+@register_loader('.arrow')
+@register_loader('.feather')
+def load_arrow(
+    input_file: str,
+    progress: Progress | None = None,
+    **kwargs,
+):
+    quiet = kwargs.get('quiet', False)
+    limit = kwargs.get('limit', None)
+    if progress is None:
+        console = Console()
+    else:
+        console = progress.console
+    if not quiet:
+        console.log('Loading columnar data from: ', input_file)
+    def iter_rows():
+        pa = import_pyarrow()
+        schema = None
+        nested = False
+        num_rows = 0
+        for batch in iter_arrow_batches(input_file, kwargs.get('columns')):
+            if schema is None:
+                # NOTE: 全行でヘッダーを共有する
+                #   (All the rows share the same header)
+                names = batch.schema.names
+                schema = Schema(names)
+                # NOTE: The values of the struct columns are dicts, which
+                #       are adopted as the nested fields of the rows
+                nested = any(
+                    pa.types.is_struct(field.type) for field in batch.schema
+                )
+            columns = [column.to_pylist() for column in batch.columns]
+            for values in zip(*columns):
+                if limit and num_rows >= limit:
+                    return
+                if nested:
+                    yield Row.from_nested(dict(zip(names, values)))
+                else:
+                    yield Row.from_flat(schema, list(values))
+                num_rows += 1
+    yield from track(
+        iter_rows(),
+        description='Loading rows...',
+        total=kwargs.get('total', None),
+        disable=quiet,
+        progress=progress,
+    )
+
+@register_counter('.parquet')
+@register_counter('.arrow')
+@register_counter('.feather')
+def count_arrow(
+    input_file: str,
+    **kwargs,
+):
+    pa = import_pyarrow()
+    check_uncompressed(input_file)
+    if get_extension(input_file) == '.parquet':
+        with pa.parquet.ParquetFile(input_file) as parquet_file:
+            return parquet_file.metadata.num_rows
+    with pa.memory_map(input_file) as source:
+        reader = pa.ipc.open_file(source)
+        return sum(
+            reader.get_batch(i).num_rows
+            for i in range(reader.num_record_batches)
+        )
+
+@register_writer('.parquet')
+@register_writer('.arrow')
+@register_writer('.feather')
+class ArrowWriter(BaseWriter):
+    def __init__(
+        self,
+        target: str,
+        batch_size: int = ARROW_BATCH_SIZE,
+        **kwargs,
+    ):
+        self.pa = import_pyarrow()
+        check_uncompressed(target)
+        self.batch_size = batch_size
+        # NOTE: Nested values of the rows not converted into the columns yet
+        self.buffer: list[dict[str, Any]] = []
+        # NOTE: Inferred from the first batch and widened by the later ones
+        self.schema = None
+        self.writer = None
+        # NOTE: Path of the file written, other than the target after the
+        #       schema is widened
+        self.path = target
+        self.num_rewrites = 0
+        super().__init__(target, **kwargs)
+
+    def support_streaming(self):
+        return True
+
+    def _open(self):
+        # NOTE: The file is opened by pyarrow when the schema is decided
+        self._start_progress()
+
+    def _write_row(self, row: Row):
+        self.buffer.append(row.nested)
+        if len(self.buffer) >= self.batch_size:
+            self._flush()
+
+    def _open_writer(
+        self,
+        path: str,
+        schema,
+    ):
+        pa = self.pa
+        self.path = path
+        self.schema = schema
+        if get_extension(self.target) == '.parquet':
+            self.writer = pa.parquet.ParquetWriter(path, schema)
+        else:
+            self.writer = pa.ipc.new_file(path, schema)
+
+    def _conform(
+        self,
+        batch,
+        schema,
+    ):
+        '''
+        Convert the batch into the schema, filling the missing columns with
+        nulls.
+        '''
+        pa = self.pa
+        arrays = []
+        for field in schema:
+            index = batch.schema.get_field_index(field.name)
+            if index < 0:
+                arrays.append(pa.nulls(batch.num_rows, field.type))
+            elif batch.schema.field(index).type == field.type:
+                arrays.append(batch.column(index))
+            else:
+                arrays.append(pa.array(
+                    batch.column(index).to_pylist(), type=field.type
+                ))
+        return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def _widen(
+        self,
+        schema,
+    ):
+        '''
+        Rewrite the batches written so far into a new file of the wider
+        schema, which replaces the target when closed.
+        '''
+        self.writer.close()
+        path = self.path
+        root, ext = os.path.splitext(self.target)
+        self.num_rewrites += 1
+        self._open_writer(f'{root}.tmp{self.num_rewrites}{ext}', schema)
+        for batch in iter_arrow_batches(path):
+            self.writer.write_batch(self._conform(batch, schema))
+        if path != self.target:
+            os.remove(path)
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        pa = self.pa
+        rows = self.buffer
+        self.buffer = []
+        names = list(dict.fromkeys(key for row in rows for key in row))
+        try:
+            # NOTE: Values are not converted into the types of the previous
+            #       batches, which would truncate e.g. floats into ints
+            arrays = [
+                pa.array([row.get(name) for row in rows])
+                for name in names
+            ]
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(
+                f'Rows have values of mixed types: {e}, file: {self.target}'
+            ) from e
+        batch = pa.RecordBatch.from_arrays(arrays, names=names)
+        if self.schema is None:
+            self._open_writer(self.target, batch.schema)
+        elif batch.schema != self.schema:
+            try:
+                schema = pa.unify_schemas(
+                    [self.schema, batch.schema],
+                    promote_options = 'permissive',
+                )
+            except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+                raise ValueError(
+                    f'Rows do not match the schema of the previous rows: {e}, ' +
+                    f'file: {self.target}'
+                ) from e
+            if schema != self.schema:
+                self._widen(schema)
+            batch = self._conform(batch, schema)
+        self.writer.write_batch(batch)
+
+    def close(self):
+        if self.finished:
+            return
+        if self.writer is not None or self.buffer:
+            self._flush()
+            self.writer.close()
+            self.writer = None
+            if self.path != self.target:
+                os.replace(self.path, self.target)
+        super().close()
+        self.finished = True
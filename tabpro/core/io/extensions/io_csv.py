@@ -1,12 +1,7 @@
 #import pandas as pd
 
-from typing import (
-    Iterable,
-)
-
 import csv
-
-from collections import OrderedDict
+import os
 
 from rich.console import Console
 
@@ -14,8 +9,11 @@ from tqdm.auto import tqdm
 
 from . manage_loaders import (
     Row,
+    register_counter,
     register_loader,
 )
+from ... classes.row_batch import RowBatch
+from ... classes.schema import Schema
 from . manage_writers import (
     BaseWriter,
     register_writer,
@@ -26,7 +24,29 @@ from ... progress import (
     track,
 )
 
+from ... functions.count_lines import count_lines
+
+from .. compression import (
+    get_extension,
+    open_file,
+)
+from .. parallel import get_num_workers
+
+from . csv_reader import (
+    fast_csv_reader,
+    get_csv_dialect,
+)
+from . csv_parallel import (
+    get_split_quote,
+    iter_csv_records,
+)
+
+# NOTE: Smaller files are loaded faster than starting the worker processes
+PARALLEL_MIN_SIZE = 64 << 20
+
 @register_loader('.csv')
+@register_loader('.tsv')
+@register_loader('.psv')
 def load_csv(
     input_file: str,
     progress: Progress | None = None,
@@ -36,48 +56,106 @@ def load_csv(
     # UTF-8 with BOM
     quiet = kwargs.get('quiet', False)
     encoding = kwargs.get('encoding', 'utf-8-sig')
+    params = get_csv_dialect(
+        get_extension(input_file),
+        kwargs.get('dialect'),
+    )
     if progress is None:
         console = Console()
     else:
         console = progress.console
-    console.log('Loading CSV data from: ', input_file)
+    if not quiet:
+        console.log('Loading CSV data from: ', input_file)
+    total = kwargs.get('total', None)
+    if total is not None and not no_header:
+        # NOTE: The header is also a row of the reader
+        total += 1
     def get_iter(reader):
         return track(
             reader,
             description='Loading rows...',
+            total=total,
             disable=quiet,
             progress=progress,
         )
-    reader = csv.reader(open(input_file, 'r', encoding=encoding))
+    num_workers = kwargs.get('num_workers', None)
+    if num_workers is None:
+        num_workers = get_num_workers(
+            os.path.getsize(input_file),
+            PARALLEL_MIN_SIZE,
+        )
+    if num_workers > 1 and get_split_quote(encoding, params) is not None:
+        reader = iter_csv_records(input_file, encoding, num_workers, params)
+    else:
+        reader = fast_csv_reader(
+            open_file(input_file, 'r', encoding=encoding),
+            **params,
+        )
     if no_header:
+        schema = Schema()
         for i, row in enumerate(get_iter(reader)):
-            assert isinstance(row, Iterable)
-            d = {}
-            for j, field in enumerate(row):
-                d[f'{j}'] = field
-            yield Row.from_dict(d)
+            assert isinstance(row, list)
+            schema.ensure_width(len(row))
+            yield Row.from_flat(schema, row)
     else:
         for i, row in enumerate(get_iter(reader)):
-            assert isinstance(row, Iterable)
-            row = list(row)
+            assert isinstance(row, list)
             if i == 0:
                 header = row
+                # NOTE: 全行でヘッダーを共有する
+                #   (All the rows share the same header)
+                schema = Schema(header)
                 continue
-            d = OrderedDict()
-            for j, field in enumerate(row):
-                d[header[j]] = field
+            if len(row) > len(header):
+                raise ValueError(
+                    f'Too many fields in row {i}: ' +
+                    f'{len(row)} > {len(header)}, file: {input_file}'
+                )
             #for j in range(len(row), len(header)):
             #    d[f'__staging__.__values__.{j}'] = None
-            yield Row.from_dict(d)
+            yield Row.from_flat(schema, row)
+
+@register_counter('.csv')
+@register_counter('.tsv')
+@register_counter('.psv')
+def count_csv(
+    input_file: str,
+    no_header: bool = False,
+    **kwargs,
+):
+    encoding = kwargs.get('encoding', 'utf-8-sig')
+    params = get_csv_dialect(
+        get_extension(input_file),
+        kwargs.get('dialect'),
+    )
+    quote = get_split_quote(encoding, params)
+    if quote == b'"':
+        num_records = count_lines(input_file, quoted=True)
+    elif quote == b'':
+        num_records = count_lines(input_file)
+    else:
+        # NOTE: Parsed without building the rows
+        with open_file(input_file, 'r', encoding=encoding) as f:
+            num_records = sum(1 for _ in fast_csv_reader(f, **params))
+    if no_header:
+        return num_records
+    return max(num_records - 1, 0)
 
 @register_writer('.csv')
+@register_writer('.tsv')
+@register_writer('.psv')
 class CsvWriter(BaseWriter):
     def __init__(
         self,
         output_file: str,
+        dialect: dict | None = None,
         **kwargs,
     ):
         self.writer: csv.DictWriter | None = None
+        self.params = get_csv_dialect(
+            get_extension(output_file),
+            dialect,
+        )
         super().__init__(
             output_file,
             **kwargs,
@@ -92,10 +170,33 @@ class CsvWriter(BaseWriter):
             assert self.fobj is not None
         if self.writer is None:
             # NOTE: 最初の行を取得するまでヘッダーを決定できない
-            self.writer = csv.DictWriter(self.fobj, fieldnames=row.flat.keys())
+            self.writer = csv.DictWriter(
+                self.fobj,
+                fieldnames=row.flat.keys(),
+                **self.params,
+            )
             self.writer.writeheader()
         self.writer.writerow(row.flat)
 
+    def _write_batch(self, batch: RowBatch):
+        if len(batch) == 0:
+            return
+        start = 0
+        if self.writer is None:
+            # NOTE: The header is decided by the first row
+            self._write_row(next(batch.iter_rows()))
+            start = 1
+        fieldnames = list(self.writer.fieldnames)
+        if not batch.is_columnar or batch.has_missing or \
+                not batch.schema.is_compact or not fieldnames or \
+                sorted(fieldnames) != sorted(batch.schema.columns):
+            for index, row in enumerate(batch.iter_rows()):
+                if index >= start:
+                    self._write_row(row)
+            return
+        columns = [batch.column(name)[start:] for name in fieldnames]
+        csv.writer(self.fobj, **self.params).writerows(zip(*columns))
+
     def _write_all_rows(self):
         if self.rows:
             for row in self.rows:
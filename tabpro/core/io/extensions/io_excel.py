@@ -1,8 +1,11 @@
+from typing import (
+    Any,
+)
+
 from icecream import ic
-import numpy as np
-import pandas as pd
 
 import openpyxl
+import xlsxwriter
 
 from rich.console import Console
 
@@ -10,27 +13,33 @@ from logzero import logger
 
 from . manage_loaders import (
     Row,
+    register_counter,
     register_loader,
 )
+from ... classes.schema import Schema
 from . manage_writers import (
     BaseWriter,
     register_writer,
 )
 
-@register_loader('.xlsx')
-def load_excel(
-    input_file: str,
-    no_header: bool = False,
-    console: Console | None = None,
-    quiet: bool = False,
-    **kwargs,
+from ... progress import (
+    Progress,
+    track,
+)
+
+from .. compression import get_compression
+
+def check_uncompressed(
+    path: str,
+):
+    # NOTE: XLSX files are already compressed (ZIP archives)
+    if get_compression(path):
+        raise ValueError(f'Compressed Excel files are not supported: {path}')
+
+def select_sheet_name(
+    wb: openpyxl.Workbook,
 ):
-    if not quiet:
-        if console is None:
-            console = Console()
-        console.log('Loading excel data from: ', input_file)
     # シートの選択
-    wb = openpyxl.load_workbook(input_file)
     sheet_names = wb.sheetnames
     logger.debug(f'Sheet names: {sheet_names}')
     target_sheet_name = None
@@ -43,30 +52,192 @@ def load_excel(
                 break
     if target_sheet_name is None:
         raise ValueError('No visible sheet found')
+    return target_sheet_name
+
+# NOTE:
+#   pandas.read_excel が欠損値として扱う文字列
+#   (Strings treated as missing values by pandas.read_excel by default)
+NA_VALUES = frozenset([
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+])
+
+# NOTE: Values of the cells with errors, which are missing values as well
+ERROR_VALUES = frozenset([
+    '#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A',
+    '#GETTING_DATA',
+])
+
+def convert_excel_value(
+    value: Any,
+):
+    '''
+    Convert a cell value into a string as pandas.read_excel(dtype=str) does.
+    '''
+    if value is None:
+        return None
+    if type(value) is str:
+        if value in NA_VALUES or value in ERROR_VALUES:
+            return None
+        return value
+    if isinstance(value, float):
+        if value != value:
+            return None
+        if value.is_integer():
+            return str(int(value))
+    return str(value)
+
+def get_excel_header(
+    cells: tuple,
+):
+    '''
+    Column names as pandas.read_excel gives them.
+    '''
+    names = []
+    for index, value in enumerate(cells):
+        if value is None or value == '':
+            names.append(f'Unnamed: {index}')
+        elif isinstance(value, float) and value.is_integer():
+            names.append(str(int(value)))
+        else:
+            names.append(str(value))
+    # NOTE: Duplicate names are renamed to "name.1", "name.2", ...
+    counts: dict[str, int] = {}
+    for index, name in enumerate(names):
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f'{name}.{count}'
+            count = counts.get(name, 0)
+        names[index] = name
+        counts[name] = count + 1
+    return names
+
+def get_excel_width(
+    cells: tuple,
+):
+    '''
+    The number of the cells in the row except the empty ones at the end.
+    '''
+    width = len(cells)
+    while width > 0 and (cells[width - 1] is None or cells[width - 1] == ''):
+        width -= 1
+    return width
+
+@register_loader('.xlsx')
+def load_excel(
+    input_file: str,
+    no_header: bool = False,
+    progress: Progress | None = None,
+    quiet: bool = False,
+    **kwargs,
+):
+    if not quiet:
+        if progress is None:
+            console = Console()
+        else:
+            console = progress.console
+        console.log('Loading excel data from: ', input_file)
+    check_uncompressed(input_file)
+    total = kwargs.get('total', None)
+    if total is not None and not no_header:
+        total += 1
     # NOTE:
-    #   Excelで勝手に日時データなどに変換されてしまうことを防ぐため
-    #   (To prevent Excel from automatically converting data like dates and times)
-    dtype = str
+    #   読み取り専用モードでシート全体を読み込まずに行を順に読む
+    #   (The read-only mode streams the rows without loading the whole sheet)
+    wb = openpyxl.load_workbook(
+        input_file,
+        read_only=True,
+        data_only=True,
+    )
+    try:
+        ws = wb[select_sheet_name(wb)]
+        if total is None and not kwargs.get('limit'):
+            # NOTE: The recorded dimension is close enough for the progress
+            #       bar, and counting the rows takes as long as loading them
+            total = ws.max_row
+        # NOTE: The recorded dimension might be wrong
+        ws.reset_dimensions()
+        schema = Schema() if no_header else None
+        num_blank_rows = 0
+        for cells in track(
+            ws.iter_rows(values_only=True),
+            description='Loading rows...',
+            total=total,
+            disable=quiet,
+            progress=progress,
+        ):
+            width = get_excel_width(cells)
+            if schema is None:
+                schema = Schema(get_excel_header(cells[:width]))
+                continue
+            if width == 0:
+                # NOTE: Blank rows at the end of the sheet are ignored
+                num_blank_rows += 1
+                continue
+            if width > len(schema):
+                # NOTE:
+                #   ヘッダーより長い行の列を追加する
+                #   (Columns of the rows longer than the header, which the
+                #   rows before do not have)
+                if no_header:
+                    schema.ensure_width(width)
+                else:
+                    for index in range(len(schema), width):
+                        schema.add_column(f'Unnamed: {index}')
+            for _ in range(num_blank_rows):
+                yield Row.from_flat(schema, [None] * len(schema))
+            num_blank_rows = 0
+            values = [convert_excel_value(value) for value in cells[:width]]
+            if width < len(schema):
+                values.extend([None] * (len(schema) - width))
+            yield Row.from_flat(schema, values)
+    finally:
+        wb.close()
+
+@register_counter('.xlsx', slow=True)
+def count_excel(
+    input_file: str,
+    no_header: bool = False,
+    **kwargs,
+):
+    '''
+    Count the rows as load_excel loads them, up to the last row which is not
+    blank. The cells are read without being converted.
+    '''
+    check_uncompressed(input_file)
+    wb = openpyxl.load_workbook(input_file, read_only=True, data_only=True)
+    try:
+        ws = wb[select_sheet_name(wb)]
+        # NOTE: The recorded dimension might include the blank rows at the
+        #       end, which are not loaded
+        ws.reset_dimensions()
+        num_rows = 0
+        for index, cells in enumerate(ws.iter_rows(values_only=True), 1):
+            if get_excel_width(cells) > 0:
+                num_rows = index
+    finally:
+        wb.close()
     if no_header:
-        df = pd.read_excel(
-            input_file,
-            header=None,
-            dtype=dtype,
-            sheet_name=target_sheet_name,
-        )
-    else:
-        df = pd.read_excel(
-            input_file,
-            dtype=str,
-            sheet_name=target_sheet_name,
-        )
-    # NOTE:
-    #   NaN を None に変換しておかないと厄介
-    #   (Need to convert NaN to None to avoid complications)
-    df = df.replace([np.nan], [None])
-    #return df
-    for i, row in df.iterrows():
-        yield Row.from_dict(row.to_dict())
+        return num_rows
+    return max(num_rows - 1, 0)
+
+# NOTE: Including the header row
+MAX_EXCEL_ROWS = 1048576
+MAX_EXCEL_COLUMNS = 16384
+
+def to_excel_value(
+    value: Any,
+):
+    if value is None or isinstance(value, (str, bool, int)):
+        return value
+    if isinstance(value, float):
+        if value != value:
+            return None
+        return value
+    # NOTE: e.g. lists and dictionaries
+    return str(value)
 
 @register_writer('.xlsx')
 class ExcelWriter(BaseWriter):
@@ -75,15 +246,55 @@ class ExcelWriter(BaseWriter):
         target: str,
         **kwargs,
     ):
+        # NOTE:
+        #   ヘッダーは全行の列の和集合なので、全行が揃うまで決まらない
+        #   (The header is the union of the columns of all the rows, so the
+        #   rows are spooled until all of them are pushed)
+        self.columns: dict[str, int] = {}
+        check_uncompressed(target)
         super().__init__(target, **kwargs)
 
     def support_streaming(self):
         return False
-    
+
+    def _spool_row(self, row: Row):
+        columns = self.columns
+        for key in row.flat:
+            if key not in columns:
+                columns[key] = len(columns)
+        super()._spool_row(row)
+
     def _write_all_rows(
         self,
     ):
-        if self.rows:
-            df = pd.DataFrame([row.flat for row in self.rows])
-            df.to_excel(self.target, index=False)
+        if not self.rows:
+            self.finished = True
+            return
+        columns = self.columns
+        if len(columns) > MAX_EXCEL_COLUMNS:
+            raise ValueError(
+                f'Too many columns for Excel: {len(columns)} > ' +
+                f'{MAX_EXCEL_COLUMNS}, file: {self.target}'
+            )
+        header = list(columns)
+        # NOTE: Each row is flushed into the file when the next row is written
+        wb = xlsxwriter.Workbook(self.target, {
+            'constant_memory': True,
+            'strings_to_formulas': False,
+            'strings_to_urls': False,
+        })
+        ws = None
+        row_index = MAX_EXCEL_ROWS
+        for row in self.rows:
+            if row_index >= MAX_EXCEL_ROWS:
+                # NOTE: The rows over the limit go to the next sheet
+                ws = wb.add_worksheet()
+                ws.write_row(0, 0, header)
+                row_index = 1
+            values = [None] * len(header)
+            for key, value in row.flat.items():
+                values[columns[key]] = to_excel_value(value)
+            ws.write_row(row_index, 0, values)
+            row_index += 1
+        wb.close()
         self.finished = True
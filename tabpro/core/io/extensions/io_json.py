@@ -14,36 +14,134 @@ from . manage_writers import (
 
 from ... progress import Progress
 
+from .. compression import open_file
+from .. json_codec import get_json_codec
+
 from .... logging import logger
 
 # 除外対象: 改行、二重引用符のエスケープ、バックスラッシュのエスケープ
 # 半角円記号や除外対象以外を追加エスケープ
 # 取り急ぎはその他の制御文字については対応なし
-#regex_escape = re.compile(r'(\\[^n"\\])')
-#regex_replace = r'\\\\\1'
+# NOTE:
+#   除外対象のエスケープは2文字まとめてマッチさせてそのまま残し、
+#   それ以外のバックスラッシュ（末尾を除く）を二重にする
+#   (Excluded escapes are matched as a pair and kept as they are,
+#    and the other backslashes except the last character are doubled)
+regex_escape = re.compile(r'\\([n"\\])|\\(?=[\s\S])')
+
+def _replace_escape(match: re.Match) -> str:
+    if match.group(1):
+        return match.group(0)
+    return '\\\\'
+
 def escape_json(str_json: str) -> str:
-    # NOTE: 正規表現で全てカバーするのは厳しそう
-    #str_json = re.sub(r'(\\[^n"\\])', '\\\\\\1', str_json)
-    # NOTE: 文字単位処理
-    chars = list(str_json)
-    changed = False
-    i = 0
-    while i < len(chars):
-        char = chars[i]
-        if i == len(chars) - 1:
-            break
-        next_char = chars[i+1]
-        if char == '\\':
-            if next_char in ['n', '"', '\\']:
-                i = i + 2
-                continue
-            else:
-                chars[i] = '\\\\'
-                changed = True
-        i = i + 1
-    if changed:
-        str_json = ''.join(chars)
-    return str_json
+    if '\\' not in str_json:
+        # NOTE: Most of the lines have nothing to escape
+        return str_json
+    return regex_escape.sub(_replace_escape, str_json)
+
+# NOTE: Size of the text read at once by the streaming array reader
+JSON_CHUNK_SIZE = 1 << 20
+
+def split_escape_json(
+    str_json: str,
+) -> tuple[str, str]:
+    '''
+    Apply escape_json to a chunk of a longer text.
+    Returns the escaped text and the rest which needs the next chunk.
+    '''
+    # NOTE: Backslashes are paired from the start of each run,
+    #       so an odd run at the end depends on the next character
+    num_trailing = len(str_json) - len(str_json.rstrip('\\'))
+    if num_trailing % 2 == 1:
+        return escape_json(str_json[:-1]), str_json[-1]
+    return escape_json(str_json), ''
+
+NUMBER_CHARS = frozenset('0123456789+-.eE')
+
+def iter_json_array(
+    f,
+    chunk_size: int = JSON_CHUNK_SIZE,
+    name: str | None = None,
+):
+    '''
+    Yield the elements of a JSON array from a text file object one by one,
+    keeping only about one element in memory.
+    '''
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pending = ''
+    eof = False
+    pos = 0
+    def fill(min_size: int):
+        # NOTE: Read until the unread text grows to at least min_size
+        nonlocal buffer, pending, eof, pos
+        if pos > 0:
+            buffer = buffer[pos:]
+            pos = 0
+        while not eof and len(buffer) < min_size:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                eof = True
+                buffer += escape_json(pending)
+                pending = ''
+                break
+            escaped, pending = split_escape_json(pending + chunk)
+            buffer += escaped
+    def skip_spaces():
+        nonlocal pos
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\n\r':
+                pos += 1
+            if pos < len(buffer) or eof:
+                return
+            fill(1)
+    skip_spaces()
+    if pos >= len(buffer) or buffer[pos] != '[':
+        if pos >= len(buffer):
+            raise json.JSONDecodeError('Expecting value', buffer, pos)
+        raise ValueError(f'invalid json array data: {name}')
+    pos += 1
+    skip_spaces()
+    if pos < len(buffer) and buffer[pos] == ']':
+        pos += 1
+    else:
+        while True:
+            skip_spaces()
+            while True:
+                try:
+                    value, end = decoder.raw_decode(buffer, pos)
+                    if eof:
+                        break
+                    if end < len(buffer) and buffer[end] in ' \t\n\r,]':
+                        break
+                    # NOTE: A number cut like "3." or "1e" at the end of the
+                    # buffer might continue in the next chunk
+                    if not all(c in NUMBER_CHARS for c in buffer[end:]):
+                        break
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                # NOTE: Double the buffer to avoid decoding again and again
+                fill(max(2 * (len(buffer) - pos), chunk_size))
+            pos = end
+            yield value
+            skip_spaces()
+            if pos >= len(buffer):
+                raise json.JSONDecodeError(
+                    "Expecting ',' delimiter", buffer, pos
+                )
+            if buffer[pos] == ']':
+                pos += 1
+                break
+            if buffer[pos] != ',':
+                raise json.JSONDecodeError(
+                    "Expecting ',' delimiter", buffer, pos
+                )
+            pos += 1
+    skip_spaces()
+    if pos < len(buffer):
+        raise json.JSONDecodeError('Extra data', buffer, pos)
 
 @register_loader('.json')
 def load_json(
@@ -58,14 +156,9 @@ def load_json(
         else:
             console = Console()
         console.log('loading json data from: ', input_file)
-    with open(input_file, 'r') as f:
-        str_json = f.read()
-        str_json = escape_json(str_json)
-        data = json.loads(str_json)
-    if not isinstance(data, list):
-        raise ValueError(f'invalid json array data: {input_file}')
-    for row in data:
-        yield Row.from_dict(row)
+    with open_file(input_file, 'r') as f:
+        for row in iter_json_array(f, name=input_file):
+            yield Row.from_nested(row)
 
 @register_writer('.json')
 class JsonWriter(BaseWriter):
@@ -84,10 +177,17 @@ class JsonWriter(BaseWriter):
         #if not self.quiet:
         #    console = self._get_console()
         #    console.log(f'writing {len(self.rows)} json rows into: ', self.target)
-        if self.rows:
-            rows = [row.nested for row in self.rows]
-            if self.fobj:
-                self.fobj.write(json.dumps(rows, indent=2, ensure_ascii=False))
-                self.fobj.close()
+        if self.rows and self.fobj:
+            # NOTE: Same as dumping the list of the rows with indent=2,
+            #       but without keeping all of them in memory
+            dumps = get_json_codec().dumps
+            self.fobj.write('[\n')
+            for index, row in enumerate(self.rows):
+                if index > 0:
+                    self.fobj.write(',\n')
+                text = dumps(row.nested, indent=2)
+                self.fobj.write('  ' + text.replace('\n', '\n  '))
+            self.fobj.write('\n]')
+            self.fobj.close()
         self.fobj = None
         self.finished = True
@@ -1,9 +1,19 @@
-import json
+import queue
+import threading
+
+from typing import (
+    Any,
+)
+
+from rich.console import Console
 
 from . manage_loaders import (
     Row,
+    register_counter,
     register_loader,
+    register_range_loader,
 )
+from ... classes.row_batch import RowBatch
 from . manage_writers import (
     BaseWriter,
     register_writer,
@@ -11,9 +21,23 @@ from . manage_writers import (
 
 from ... progress import (
     Progress,
+    track,
+)
+
+from .. json_codec import get_json_codec
+
+from ... functions.count_lines import count_lines
+
+from .. compression import (
+    get_compression,
+    open_file,
 )
 
 from . io_json import escape_json
+from . jsonl_index import (
+    JsonlIndex,
+    load_index,
+)
 
 @register_loader('.jsonl')
 def load_jsonl(
@@ -46,18 +70,19 @@ def load_jsonl(
     if not quiet:
         count_task_id = progress.add_task(
             description = 'Loaded JSON rows',
-            total = limit,
+            total = kwargs.get('total', None) or limit,
             disable = quiet,
         )
-    with fn_open(input_file, 'r') as f:
+    codec = get_json_codec()
+    with open_file(input_file, 'r', fn_open=fn_open) as f:
         for i, line in enumerate(f):
             if limit and i >= limit:
                 break
             line = escape_json(line)
-            row = json.loads(line)
+            row = codec.loads(line)
             if not quiet:
                 progress.update(count_task_id, advance=1)
-            yield Row.from_dict(row)
+            yield Row.from_nested(row)
         f.close()
         if open_task_id is not None:
             progress.stop_task(open_task_id)
@@ -66,28 +91,144 @@ def load_jsonl(
     if orig_progress is None:
         progress.stop()
 
+@register_range_loader('.jsonl')
+def load_jsonl_range(
+    input_file: str,
+    start: int = 0,
+    stop: int | None = None,
+    skip_rows: set[int] | None = None,
+    progress: Progress | None = None,
+    **kwargs,
+):
+    quiet = kwargs.get('quiet', False)
+    if not quiet:
+        console = progress.console if progress else Console()
+        console.log('Loading from: ', input_file)
+    codec = get_json_codec()
+    with JsonlIndex(input_file) as index:
+        if stop is None or stop > len(index):
+            stop = len(index)
+        lines = index.iter_lines(start, stop, skip_rows)
+        for row_index, line in track(
+            lines,
+            description='Loading rows...',
+            total=max(stop - start, 0),
+            disable=quiet,
+            progress=progress,
+        ):
+            yield row_index, Row.from_nested(codec.loads(escape_json(line)))
+
+@register_counter('.jsonl')
+def count_jsonl(
+    input_file: str,
+    **kwargs,
+):
+    if not get_compression(input_file):
+        # NOTE: Already counted if the file has been indexed
+        loaded = load_index(input_file, with_offsets=False)
+        if loaded is not None:
+            return loaded[1]
+    return count_lines(input_file)
+
+# NOTE: Number of the rows encoded and written at once
+JSONL_WRITE_BATCH_SIZE = 1024
+
+# NOTE: Maximum number of the batches waiting for the background thread
+MAX_PENDING_BATCHES = 16
+
 @register_writer('.jsonl')
 class JsonLinesWriter(BaseWriter):
     def __init__(
         self,
         output_file: str,
+        batch_size: int = JSONL_WRITE_BATCH_SIZE,
         **kwargs,
     ):
+        self.codec = get_json_codec()
+        self.batch_size = batch_size
+        # NOTE: Nested values of the rows not written yet
+        self.buffer: list[Any] = []
+        self.queue: queue.Queue[list[Any] | None] | None = None
+        self.thread: threading.Thread | None = None
+        self.error: BaseException | None = None
         super().__init__(output_file, **kwargs)
 
     def support_streaming(self):
         return True
 
     def _write_row(self, row: Row):
+        # NOTE: Built in this thread, only encoded in the background thread
+        self.buffer.append(row.nested)
+        if len(self.buffer) >= self.batch_size:
+            self._flush_buffer()
+
+    def _write_batch(self, batch: RowBatch):
+        self.buffer.extend(batch.iter_nested())
+        if len(self.buffer) >= self.batch_size:
+            self._flush_buffer()
+
+    def _write_lines(self, values: list[Any]):
         if not self.fobj:
             self._open()
             assert self.fobj is not None
-        self.fobj.write(json.dumps(row.nested, ensure_ascii=False))
-        self.fobj.write('\n')
+        dumps = self.codec.dumps
+        lines = [dumps(nested) for nested in values]
+        self.fobj.write('\n'.join(lines) + '\n')
+
+    def _run(self):
+        assert self.queue is not None
+        while True:
+            values = self.queue.get()
+            if values is None:
+                break
+            if self.error is not None:
+                # NOTE: Consumed anyway not to block the pushing thread
+                continue
+            try:
+                self._write_lines(values)
+            except BaseException as e:
+                self.error = e
+
+    def _flush_buffer(self):
+        if self.error is not None:
+            raise self.error
+        if not self.buffer:
+            return
+        values = self.buffer
+        self.buffer = []
+        if not self.background_writing:
+            self._write_lines(values)
+            return
+        if self.thread is None:
+            self.queue = queue.Queue(MAX_PENDING_BATCHES)
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        assert self.queue is not None
+        self.queue.put(values)
+
+    def _finish(self):
+        try:
+            self._flush_buffer()
+        finally:
+            if self.thread is not None:
+                assert self.queue is not None
+                self.queue.put(None)
+                self.thread.join()
+                self.thread = None
+        if self.error is not None:
+            raise self.error
 
     def _write_all_rows(self):
         if self.rows:
             for row in self.rows:
                 self._write_row(row)
+        self._finish()
         if self.fobj:
             self.fobj.close()
+
+    def close(self):
+        try:
+            if not self.finished:
+                self._finish()
+        finally:
+            super().close()
@@ -0,0 +1,488 @@
+'''
+SQLite database files
+
+The rows are stored as the flat columns of a table ("data" by default), with
+the lists and the mappings encoded as JSON text in the columns declared as
+JSON. The rows are loaded from a table or from the result of a query.
+'''
+
+import os
+import pathlib
+import sqlite3
+
+from typing import (
+    Any,
+)
+
+from rich.console import Console
+
+from . manage_loaders import (
+    Row,
+    register_counter,
+    register_loader,
+)
+from ... classes.schema import Schema
+from . manage_writers import (
+    BaseWriter,
+    register_writer,
+)
+
+from ... progress import (
+    Progress,
+    track,
+)
+
+from .. compression import get_compression
+from .. json_codec import get_json_codec
+
+DEFAULT_TABLE = 'data'
+
+# NOTE: Prefix of the table which the rows are inserted into until the end
+TEMP_TABLE_PREFIX = '_tabpro_loading_'
+
+# NOTE: Number of the rows fetched or inserted at once
+SQLITE_BATCH_SIZE = 4096
+
+# NOTE: Number of the rows inserted in a transaction
+SQLITE_TRANSACTION_SIZE = 1 << 18
+
+# NOTE: Pragmas for the bulk loading into a new table, the database may be
+#       corrupted if the system crashes while writing
+WRITE_PRAGMAS = [
+    'PRAGMA journal_mode = WAL',
+    'PRAGMA synchronous = OFF',
+    'PRAGMA temp_store = MEMORY',
+    'PRAGMA cache_size = -65536',
+]
+
+# NOTE: Values stored as they are, the others are converted
+SQLITE_TYPES = {
+    bool: 'INTEGER',
+    int: 'INTEGER',
+    float: 'REAL',
+    str: 'TEXT',
+    bytes: 'BLOB',
+}
+
+def check_uncompressed(
+    path: str,
+):
+    # NOTE: The database files are read and written at random
+    if get_compression(path):
+        raise ValueError(
+            f'Compressed SQLite files are not supported: {path}'
+        )
+
+def quote_identifier(
+    name: str,
+):
+    return '"' + name.replace('"', '""') + '"'
+
+def connect_readonly(
+    input_file: str,
+):
+    check_uncompressed(input_file)
+    if not os.path.exists(input_file):
+        raise FileNotFoundError(f'File not found: {input_file}')
+    uri = pathlib.Path(input_file).absolute().as_uri() + '?mode=ro'
+    return sqlite3.connect(uri, uri=True)
+
+def find_table(
+    connection: sqlite3.Connection,
+    table: str | None,
+):
+    '''
+    The table to load, the only table of the database if not specified.
+    '''
+    tables = [
+        name for name, in connection.execute(
+            "SELECT name FROM sqlite_master " +
+            "WHERE type = 'table' AND name NOT LIKE 'sqlite_%' ORDER BY name"
+        )
+        # NOTE: e.g. Left by a writer which was killed
+        if not name.startswith(TEMP_TABLE_PREFIX)
+    ]
+    if table is not None:
+        if table not in tables:
+            raise ValueError(f'Table not found: {table}, tables: {tables}')
+        return table
+    if len(tables) == 1:
+        return tables[0]
+    if DEFAULT_TABLE in tables:
+        return DEFAULT_TABLE
+    raise ValueError(f'Table or query should be specified, tables: {tables}')
+
+def is_referenced(
+    name: str,
+    columns: set[str],
+):
+    # NOTE: e.g. "info.a" is referenced by "info"
+    segments = name.split('.')
+    return any(
+        '.'.join(segments[:depth]) in columns
+        for depth in range(1, len(segments) + 1)
+    )
+
+def get_select_query(
+    connection: sqlite3.Connection,
+    table: str | None = None,
+    query: str | None = None,
+    columns: list[str] | None = None,
+):
+    '''
+    The query to load the rows, and the names of the JSON columns.
+    '''
+    if query is not None:
+        if table is not None:
+            raise ValueError(
+                f'Either table or query should be specified: {table}, {query}'
+            )
+        # NOTE: The declared types of the results are unknown
+        return query, set()
+    table = find_table(connection, table)
+    table_info = [
+        (name, declared_type)
+        for _, name, declared_type, *_ in connection.execute(
+            f'PRAGMA table_info({quote_identifier(table)})'
+        )
+    ]
+    if columns is not None:
+        referenced = set(columns)
+        selected = [
+            (name, declared_type) for name, declared_type in table_info
+            if is_referenced(name, referenced)
+        ]
+        # NOTE: All the columns are loaded if none of them are referenced,
+        #       not to lose the rows
+        if selected:
+            table_info = selected
+    names = [name for name, _ in table_info]
+    json_columns = {
+        name for name, declared_type in table_info
+        if declared_type.upper() == 'JSON'
+    }
+    str_columns = ', '.join(quote_identifier(name) for name in names)
+    return f'SELECT {str_columns} FROM {quote_identifier(table)}', json_columns
+
+@register_loader('.sqlite')
+@register_loader('.db')
+def load_sqlite(
+    input_file: str,
+    progress: Progress | None = None,
+    **kwargs,
+):
+    quiet = kwargs.get('quiet', False)
+    limit = kwargs.get('limit', None)
+    if progress is None:
+        console = Console()
+    else:
+        console = progress.console
+    if not quiet:
+        console.log('Loading database from: ', input_file)
+    def iter_rows():
+        codec = get_json_codec()
+        connection = connect_readonly(input_file)
+        try:
+            query, json_columns = get_select_query(
+                connection,
+                table = kwargs.get('table'),
+                query = kwargs.get('query'),
+                columns = kwargs.get('columns'),
+            )
+            # NOTE: The rows are stepped through by the cursor, not all
+            #       fetched into the memory
+            cursor = connection.execute(query)
+            names = [description[0] for description in cursor.description]
+            # NOTE: 全行でヘッダーを共有する
+            #   (All the rows share the same header)
+            schema = Schema(names)
+            json_indices = [
+                index for index, name in enumerate(names)
+                if name in json_columns
+            ]
+            num_rows = 0
+            while True:
+                records = cursor.fetchmany(SQLITE_BATCH_SIZE)
+                if not records:
+                    break
+                for record in records:
+                    if limit and num_rows >= limit:
+                        return
+                    values = list(record)
+                    for index in json_indices:
+                        if isinstance(values[index], str):
+                            values[index] = codec.loads(values[index])
+                    yield Row.from_flat(schema, values)
+                    num_rows += 1
+        finally:
+            connection.close()
+    yield from track(
+        iter_rows(),
+        description='Loading rows...',
+        total=kwargs.get('total', None),
+        disable=quiet,
+        progress=progress,
+    )
+
+@register_counter('.sqlite')
+@register_counter('.db')
+def count_sqlite(
+    input_file: str,
+    **kwargs,
+):
+    connection = connect_readonly(input_file)
+    try:
+        query, _ = get_select_query(
+            connection,
+            table = kwargs.get('table'),
+            query = kwargs.get('query'),
+        )
+        num_rows, = connection.execute(
+            f'SELECT COUNT(*) FROM ({query})'
+        ).fetchone()
+        return num_rows
+    finally:
+        connection.close()
+
+def get_declared_type(
+    values: list[Any],
+):
+    '''
+    The declared type of the column decided by the first value which is not
+    None, or an empty string for the column of no type.
+    '''
+    for value in values:
+        if value is None:
+            continue
+        if isinstance(value, (list, tuple, dict)):
+            return 'JSON'
+        return SQLITE_TYPES.get(type(value), 'TEXT')
+    return ''
+
+@register_writer('.sqlite')
+@register_writer('.db')
+class SqliteWriter(BaseWriter):
+    def __init__(
+        self,
+        target: str,
+        table: str = DEFAULT_TABLE,
+        indexes: list[str | list[str]] | None = None,
+        batch_size: int = SQLITE_BATCH_SIZE,
+        **kwargs,
+    ):
+        '''
+        The rows are inserted into a temporary table, which replaces the
+        table at last, so that the table is kept if the writing fails.
+        The other tables are kept. The indexes of the columns are created
+        after all the rows are inserted.
+        '''
+        check_uncompressed(target)
+        self.table = table
+        self.temp_table = TEMP_TABLE_PREFIX + table
+        self.indexes = indexes or []
+        self.batch_size = batch_size
+        self.codec = get_json_codec()
+        # NOTE: Flat values of the rows not inserted yet
+        self.buffer: list[dict[str, Any]] = []
+        # NOTE: Decided by the first batch, and added by the later ones
+        self.columns: list[str] | None = None
+        # NOTE: Columns declared as JSON, of which all the values are encoded
+        self.json_columns: set[str] = set()
+        self.encoders: list = []
+        self.connection: sqlite3.Connection | None = None
+        self.insert_query: str | None = None
+        self.num_uncommitted_rows: int = 0
+        self.failed: bool = False
+        super().__init__(target, **kwargs)
+
+    def support_streaming(self):
+        return True
+
+    def _open(self):
+        # NOTE: The database is opened when the columns are decided
+        self._start_progress()
+
+    def _write_row(self, row: Row):
+        self.buffer.append(row.flat)
+        if len(self.buffer) >= self.batch_size:
+            self._flush()
+
+    def _get_definition(
+        self,
+        name: str,
+        rows: list[dict[str, Any]],
+    ):
+        declared_type = get_declared_type([row.get(name) for row in rows])
+        if declared_type == 'JSON':
+            self.json_columns.add(name)
+        return f'{quote_identifier(name)} {declared_type}'.strip()
+
+    def _set_columns(
+        self,
+        columns: list[str],
+    ):
+        self.columns = columns
+        self.encoders = [
+            self._encode_json if name in self.json_columns else self._encode
+            for name in columns
+        ]
+        str_columns = ', '.join(quote_identifier(name) for name in columns)
+        self.insert_query = \
+            f'INSERT INTO {quote_identifier(self.temp_table)} ' + \
+            f'({str_columns}) VALUES ({", ".join("?" * len(columns))})'
+
+    def _create_table(
+        self,
+        rows: list[dict[str, Any]],
+    ):
+        columns = list(dict.fromkeys(key for row in rows for key in row))
+        definitions = [self._get_definition(name, rows) for name in columns]
+        self.connection = sqlite3.connect(self.target, isolation_level=None)
+        for pragma in WRITE_PRAGMAS:
+            self.connection.execute(pragma)
+        temp_table = quote_identifier(self.temp_table)
+        self.connection.execute('BEGIN')
+        # NOTE: Left by a writer which was killed
+        self.connection.execute(f'DROP TABLE IF EXISTS {temp_table}')
+        self.connection.execute(
+            f'CREATE TABLE {temp_table} ({", ".join(definitions)})'
+        )
+        self._set_columns(columns)
+
+    def _add_columns(
+        self,
+        rows: list[dict[str, Any]],
+    ):
+        assert self.connection is not None
+        assert self.columns is not None
+        known = set(self.columns)
+        unknown = list(dict.fromkeys(
+            key for row in rows for key in row if key not in known
+        ))
+        if not unknown:
+            return
+        temp_table = quote_identifier(self.temp_table)
+        for name in unknown:
+            self.connection.execute(
+                f'ALTER TABLE {temp_table} ' +
+                f'ADD COLUMN {self._get_definition(name, rows)}'
+            )
+        self._set_columns(self.columns + unknown)
+
+    def _encode(self, value: Any):
+        if value is None or type(value) in SQLITE_TYPES:
+            return value
+        if isinstance(value, (list, tuple, dict)):
+            return self.codec.dumps(value)
+        if isinstance(value, (int, float, str, bytes)):
+            return value
+        # NOTE: e.g. datetime
+        return str(value)
+
+    def _encode_json(self, value: Any):
+        '''
+        Encode any value of a JSON column, so that a string like "[3]" is
+        not loaded as a list.
+        '''
+        if value is None:
+            return None
+        if not isinstance(value, (list, tuple, dict, str, int, float)):
+            value = str(value)
+        return self.codec.dumps(value)
+
+    def _insert(
+        self,
+        rows: list[dict[str, Any]],
+    ):
+        if self.connection is None:
+            self._create_table(rows)
+        else:
+            self._add_columns(rows)
+        assert self.connection is not None
+        assert self.columns is not None
+        encoders = list(zip(self.columns, self.encoders))
+        self.connection.executemany(self.insert_query, [
+            [encode(row.get(name)) for name, encode in encoders]
+            for row in rows
+        ])
+        self.num_uncommitted_rows += len(rows)
+        if self.num_uncommitted_rows >= SQLITE_TRANSACTION_SIZE:
+            self.connection.execute('COMMIT')
+            self.connection.execute('BEGIN')
+            self.num_uncommitted_rows = 0
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        rows = self.buffer
+        self.buffer = []
+        try:
+            self._insert(rows)
+        except BaseException:
+            self.failed = True
+            raise
+
+    def _create_indexes(self):
+        assert self.connection is not None
+        assert self.columns is not None
+        for index in self.indexes:
+            columns = [index] if isinstance(index, str) else list(index)
+            unknown = [name for name in columns if name not in self.columns]
+            if unknown:
+                raise ValueError(
+                    f'Index columns not found: {unknown}, ' +
+                    f'file: {self.target}'
+                )
+            name = '_'.join(['idx', self.table, *columns])
+            str_columns = ', '.join(quote_identifier(name) for name in columns)
+            self.connection.execute(
+                f'CREATE INDEX {quote_identifier(name)} ' +
+                f'ON {quote_identifier(self.table)} ({str_columns})'
+            )
+
+    def _replace_table(self):
+        assert self.connection is not None
+        table = quote_identifier(self.table)
+        # NOTE: In the same transaction as the last rows
+        self.connection.execute(f'DROP TABLE IF EXISTS {table}')
+        self.connection.execute(
+            f'ALTER TABLE {quote_identifier(self.temp_table)} RENAME TO {table}'
+        )
+        self._create_indexes()
+        self.connection.execute('COMMIT')
+
+    def _rollback(self):
+        assert self.connection is not None
+        if self.connection.in_transaction:
+            self.connection.execute('ROLLBACK')
+        # NOTE: The rows committed so far
+        self.connection.execute(
+            f'DROP TABLE IF EXISTS {quote_identifier(self.temp_table)}'
+        )
+
+    def _disconnect(self):
+        if self.connection is None:
+            return
+        try:
+            if self.failed:
+                self._rollback()
+            # NOTE: The WAL is merged to leave only the database file
+            self.connection.execute('PRAGMA journal_mode = DELETE')
+        finally:
+            self.connection.close()
+            self.connection = None
+
+    def close(self):
+        if self.finished:
+            return
+        try:
+            if not self.failed and (self.connection is not None or self.buffer):
+                self._flush()
+                self._replace_table()
+        except BaseException:
+            self.failed = True
+            raise
+        finally:
+            self._disconnect()
+        super().close()
+        self.finished = True
@@ -0,0 +1,255 @@
+'''
+JsonlIndex class
+
+Byte offsets of the rows of a JSONL file, for reading any row or range of
+rows from the memory-mapped file without decoding the rows before it.
+
+The offset of every INDEX_STRIDE-th row is kept in an index file in the
+cache directory ($TABPRO_CACHE_DIR, or "tabpro" in the user cache directory),
+not next to the data. It is built on the first scan and built again when
+the size or the modification time of the JSONL file changes. The rows are
+split by the line breaks as the text mode of open() does (\n, \r\n and \r).
+'''
+
+import hashlib
+import io
+import locale
+import mmap
+import os
+import re
+import struct
+
+from array import array
+from itertools import (
+    accumulate,
+    repeat,
+)
+from operator import add
+
+from logzero import logger
+
+from .. compression import get_compression
+
+CACHE_DIR_ENV = 'TABPRO_CACHE_DIR'
+
+INDEX_SUFFIX = '.idx'
+INDEX_STRIDE = 1024
+INDEX_CHUNK_SIZE = 1 << 20
+
+# NOTE: magic, size, mtime_ns, stride, num_rows
+INDEX_HEADER = struct.Struct('<8sQqQQ')
+INDEX_MAGIC = b'TPJSONLI'
+
+LINE_BREAK = re.compile(rb'\r\n?|\n')
+
+def _line_ends(
+    chunk: bytes,
+):
+    '''
+    Positions after the line breaks in the chunk.
+    '''
+    if b'\r' not in chunk:
+        parts = chunk.split(b'\n')
+        # NOTE: Sum of the lengths of the lines with the line breaks
+        return list(accumulate(map(add, map(len, parts[:-1]), repeat(1))))
+    return [m.end() for m in LINE_BREAK.finditer(chunk)]
+
+def build_offsets(
+    input_file: str,
+    stride: int = INDEX_STRIDE,
+    chunk_size: int = INDEX_CHUNK_SIZE,
+):
+    '''
+    Offsets of every stride-th row and the number of the rows.
+    '''
+    offsets = array('Q')
+    num_rows = 0
+    base = 0
+    last = b''
+    with open(input_file, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            while chunk.endswith(b'\r'):
+                # NOTE: Not to split \r\n between the chunks
+                extra = f.read(1)
+                if not extra:
+                    break
+                chunk += extra
+            if base == 0:
+                offsets.append(0)
+            ends = _line_ends(chunk)
+            # NOTE: ends[j] is the start of the row (num_rows + j + 1)
+            first = -(num_rows + 1) % stride
+            offsets.extend(base + end for end in ends[first::stride])
+            num_rows += len(ends)
+            base += len(chunk)
+            last = chunk[-1:]
+    if last and last not in (b'\n', b'\r'):
+        # NOTE: The last line without a line break
+        num_rows += 1
+    if offsets and offsets[-1] >= base:
+        # NOTE: Not a row but the end of the file
+        offsets.pop()
+    return offsets, num_rows
+
+def get_cache_dir():
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if cache_dir:
+        return cache_dir
+    base = os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'tabpro')
+
+def get_index_file(
+    input_file: str,
+):
+    '''
+    Path of the index file of the JSONL file, named by the hash of its path.
+    '''
+    path = os.path.realpath(input_file)
+    digest = hashlib.sha1(path.encode('utf-8', 'surrogateescape')).hexdigest()
+    return os.path.join(get_cache_dir(), 'jsonl_index', digest + INDEX_SUFFIX)
+
+def load_index(
+    input_file: str,
+    stride: int = INDEX_STRIDE,
+    with_offsets: bool = True,
+):
+    '''
+    Offsets and the number of the rows from the index file, or None if it
+    is missing or stale.
+    '''
+    try:
+        stat = os.stat(input_file)
+        with open(get_index_file(input_file), 'rb') as f:
+            header = f.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size:
+                return None
+            magic, size, mtime_ns, index_stride, num_rows = \
+                INDEX_HEADER.unpack(header)
+            if (magic, size, mtime_ns, index_stride) != \
+                    (INDEX_MAGIC, stat.st_size, stat.st_mtime_ns, stride):
+                return None
+            offsets = array('Q')
+            if with_offsets:
+                offsets.frombytes(f.read())
+    except (OSError, ValueError):
+        return None
+    if with_offsets and len(offsets) != -(-num_rows // stride):
+        return None
+    return offsets, num_rows
+
+class JsonlIndex:
+    def __init__(
+        self,
+        input_file: str,
+        stride: int = INDEX_STRIDE,
+        save: bool = True,
+    ):
+        if get_compression(input_file):
+            raise ValueError(
+                f'Compressed JSONL files can not be indexed: {input_file}'
+            )
+        self.input_file = input_file
+        self.index_file = get_index_file(input_file)
+        self.stride = stride
+        stat = os.stat(input_file)
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        loaded = load_index(input_file, stride)
+        if loaded is not None:
+            self.offsets, self.num_rows = loaded
+        else:
+            self.offsets, self.num_rows = build_offsets(input_file, stride)
+            if save:
+                self._save()
+        self.mm: mmap.mmap | None = None
+        if self.size > 0:
+            with open(input_file, 'rb') as f:
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        # NOTE: Same as the default of open() in text mode
+        self.encoding = locale.getpreferredencoding(False)
+
+    def _save(self):
+        temp_file = f'{self.index_file}.{os.getpid()}.tmp'
+        try:
+            os.makedirs(os.path.dirname(self.index_file), exist_ok=True)
+            with open(temp_file, 'wb') as f:
+                f.write(INDEX_HEADER.pack(
+                    INDEX_MAGIC,
+                    self.size,
+                    self.mtime_ns,
+                    self.stride,
+                    self.num_rows,
+                ))
+                f.write(self.offsets.tobytes())
+            os.replace(temp_file, self.index_file)
+        except OSError as e:
+            # NOTE: e.g. A read-only cache directory, only the scan is
+            #       repeated
+            logger.debug('failed to save the index: %s', e)
+            if os.path.exists(temp_file):
+                os.remove(temp_file)
+
+    def __len__(self):
+        return self.num_rows
+
+    def offset(
+        self,
+        row_index: int,
+    ):
+        '''
+        Byte offset of the row (or the end of the file for the number of
+        the rows).
+        '''
+        if row_index < 0 or row_index > self.num_rows:
+            raise IndexError(f'row index out of range: {row_index}')
+        if row_index == self.num_rows:
+            return self.size
+        block, rest = divmod(row_index, self.stride)
+        pos = self.offsets[block]
+        for _ in range(rest):
+            pos = LINE_BREAK.search(self.mm, pos).end()
+        return pos
+
+    def iter_lines(
+        self,
+        start: int = 0,
+        stop: int | None = None,
+        skip_rows: set[int] | None = None,
+    ):
+        '''
+        Iterate the row indices and the lines of the range of the rows,
+        except the rows to skip.
+        '''
+        if stop is None or stop > self.num_rows:
+            stop = self.num_rows
+        if start >= stop:
+            return
+        row_index = start
+        pos = self.offset(start)
+        while row_index < stop:
+            # NOTE: Decoded block by block, which start at the line starts
+            block_stop = min((row_index // self.stride + 1) * self.stride, stop)
+            end = self.offset(block_stop)
+            text = self.mm[pos:end].decode(self.encoding)
+            # NOTE: Not str.splitlines, which splits also by e.g. \x0c
+            for line in io.StringIO(text, newline=None):
+                if not skip_rows or row_index not in skip_rows:
+                    yield row_index, line
+                row_index += 1
+            pos = end
+
+    def close(self):
+        if self.mm is not None:
+            self.mm.close()
+            self.mm = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
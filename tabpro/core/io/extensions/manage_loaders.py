@@ -1,13 +1,38 @@
-import os
 from typing import Any, Generator, Protocol
 
 from ...classes.row import Row
 
+from ..compression import (
+    get_compression,
+    get_extension,
+)
+
 class LoaderType(Protocol):
     def __call__(self, input_file: str, **kwargs: Any) -> Generator[Row, None, None]:
          ...
 
+class CounterType(Protocol):
+    def __call__(self, input_file: str, **kwargs: Any) -> int:
+         ...
+
+class RangeLoaderType(Protocol):
+    def __call__(
+        self,
+        input_file: str,
+        start: int = 0,
+        stop: int | None = None,
+        skip_rows: set[int] | None = None,
+        **kwargs: Any,
+    ) -> Generator[tuple[int, Row], None, None]:
+         ...
+
 dict_loaders: dict[str, LoaderType] = {}
+# NOTE: Functions to count the rows without building them
+dict_counters: dict[str, CounterType] = {}
+# NOTE: Extensions of which the counters take about as long as the loading
+set_slow_counters: set[str] = set()
+# NOTE: Functions to load a range of the rows without decoding the others
+dict_range_loaders: dict[str, RangeLoaderType] = {}
 def register_loader(
     ext: str,
 ):
@@ -16,10 +41,50 @@ def register_loader(
         return loader
     return decorator
 
+def register_counter(
+    ext: str,
+    slow: bool = False,
+):
+    def decorator(counter):
+        dict_counters[ext] = counter
+        if slow:
+            set_slow_counters.add(ext)
+        return counter
+    return decorator
+
+def register_range_loader(
+    ext: str,
+):
+    def decorator(range_loader):
+        dict_range_loaders[ext] = range_loader
+        return range_loader
+    return decorator
+
+def get_range_loader(
+    input_file: str,
+):
+    if get_compression(input_file):
+        # NOTE: Compressed files can not be read at random
+        return None
+    ext = get_extension(input_file)
+    return dict_range_loaders.get(ext)
+
+def get_counter(
+    input_file: str,
+):
+    ext = get_extension(input_file)
+    return dict_counters.get(ext)
+
+def is_slow_counter(
+    input_file: str,
+):
+    ext = get_extension(input_file)
+    return ext in set_slow_counters
+
 def get_loader(
     input_file: str,
 ):
-    ext = os.path.splitext(input_file)[1]
+    ext = get_extension(input_file)
     if ext not in dict_loaders:
         raise ValueError(f'Unsupported file type: {ext}')
     loader = dict_loaders[ext]
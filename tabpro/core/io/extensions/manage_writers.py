@@ -1,4 +1,3 @@
-import os.path
 import pandas as pd
 
 from typing import Callable
@@ -7,6 +6,7 @@ from rich.console import Console
 
 from ... progress import Progress
 
+from ..compression import get_extension
 from ..writer import BaseWriter
 
 type Saver = Callable[[pd.DataFrame, str], None]
@@ -26,7 +26,7 @@ def register_writer(
 def check_writer(
     output_file: str,
 ):
-    ext = os.path.splitext(output_file)[1]
+    ext = get_extension(output_file)
     if ext not in dict_writers:
         raise ValueError(f'Unsupported file type: {ext}')
     writer_class = dict_writers[ext]
@@ -35,11 +35,13 @@ def check_writer(
 def get_writer(
     output_file: str,
     progress: Progress | None = None,
+    **kwargs,
 ) -> BaseWriter:
     writer_class = check_writer(output_file)
     return writer_class(
         output_file,
         progress=progress,
+        **kwargs,
     )
 
 def save(
@@ -50,3 +52,25 @@ def save(
     writer = get_writer(output_file, progress=progress)
     writer.push_rows(rows)
     writer.close()
+
+def save_all(
+    list_rows_and_files: list[tuple[list[Row], str]],
+    progress: Progress | None = None,
+):
+    '''
+    Save the rows into each file, writing the files concurrently in the
+    background threads of the writers which support them.
+    '''
+    writers = []
+    try:
+        for rows, output_file in list_rows_and_files:
+            writer = get_writer(
+                output_file,
+                progress=progress,
+                background_writing=len(list_rows_and_files) > 1,
+            )
+            writers.append(writer)
+            writer.push_rows(rows)
+    finally:
+        for writer in writers:
+            writer.close()
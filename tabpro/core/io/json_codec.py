@@ -0,0 +1,165 @@
+'''
+JSON codec registry
+
+Loaders and writers encode and decode JSON through the codec selected here.
+The fastest installed backend is used unless another one is specified with
+the TABPRO_JSON_CODEC environment variable or the --json-codec option.
+
+All the codecs write non-ASCII characters as they are (ensure_ascii=False)
+and keep the key order. Text which a faster backend cannot decode (e.g. NaN
+or integers over 64 bits) is decoded again by the standard library, and the
+data which it cannot encode as the standard library does is encoded by it.
+'''
+
+import json
+import math
+import os
+
+from typing import Any
+
+JSON_CODEC_ENV = 'TABPRO_JSON_CODEC'
+
+# NOTE: In the order of preference
+dict_json_codecs: dict[str, type['JsonCodec']] = {}
+
+_selected_codec: 'JsonCodec | None' = None
+
+def register_json_codec(
+    name: str,
+):
+    def decorator(codec: type[JsonCodec]):
+        codec.name = name
+        dict_json_codecs[name] = codec
+        return codec
+    return decorator
+
+class JsonCodec:
+    name: str = 'stdlib'
+
+    def loads(self, text: str) -> Any:
+        return json.loads(text)
+
+    def dumps(
+        self,
+        data: Any,
+        indent: int | None = None,
+    ) -> str:
+        return json.dumps(data, ensure_ascii=False, indent=indent)
+
+def has_non_finite(
+    data: Any,
+):
+    '''
+    Whether the data contains NaN or infinite floats.
+    '''
+    stack = [data]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, float):
+            if not math.isfinite(value):
+                return True
+        elif isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+@register_json_codec('orjson')
+class OrjsonCodec(JsonCodec):
+    def __init__(self):
+        import orjson
+        self.orjson = orjson
+
+    def loads(self, text: str) -> Any:
+        try:
+            return self.orjson.loads(text)
+        except self.orjson.JSONDecodeError:
+            return super().loads(text)
+
+    def dumps(
+        self,
+        data: Any,
+        indent: int | None = None,
+    ) -> str:
+        # NOTE: orjson supports only the indent of 2 spaces
+        if indent not in [None, 2]:
+            return super().dumps(data, indent=indent)
+        option = self.orjson.OPT_NON_STR_KEYS
+        if indent == 2:
+            option |= self.orjson.OPT_INDENT_2
+        try:
+            encoded = self.orjson.dumps(data, option=option)
+        except TypeError:
+            # NOTE: e.g. integers over 64 bits
+            return super().dumps(data, indent=indent)
+        # NOTE: orjson writes NaN and infinities as null, the data is
+        #       checked only when null is found
+        if b'null' in encoded and has_non_finite(data):
+            return super().dumps(data, indent=indent)
+        return encoded.decode('utf-8')
+
+@register_json_codec('ujson')
+class UjsonCodec(JsonCodec):
+    def __init__(self):
+        import ujson
+        self.ujson = ujson
+
+    def loads(self, text: str) -> Any:
+        try:
+            return self.ujson.loads(text)
+        except ValueError:
+            return super().loads(text)
+
+    def dumps(
+        self,
+        data: Any,
+        indent: int | None = None,
+    ) -> str:
+        try:
+            return self.ujson.dumps(
+                data,
+                ensure_ascii = False,
+                escape_forward_slashes = False,
+                indent = indent or 0,
+            )
+        except (OverflowError, TypeError):
+            return super().dumps(data, indent=indent)
+
+register_json_codec('stdlib')(JsonCodec)
+
+def create_json_codec(
+    name: str,
+) -> JsonCodec:
+    if name not in dict_json_codecs:
+        raise ValueError(
+            f'Unsupported JSON codec: {name}, ' +
+            f'available: {list(dict_json_codecs.keys())}'
+        )
+    try:
+        return dict_json_codecs[name]()
+    except ImportError as e:
+        raise ValueError(f'JSON codec is not installed: {name}') from e
+
+def set_json_codec(
+    name: str | None,
+) -> JsonCodec:
+    '''
+    Select the JSON codec by its name, or the fastest installed one for
+    None or "auto".
+    '''
+    global _selected_codec
+    if name and name != 'auto':
+        _selected_codec = create_json_codec(name)
+        return _selected_codec
+    for codec_name in dict_json_codecs:
+        try:
+            _selected_codec = create_json_codec(codec_name)
+            break
+        except ValueError:
+            continue
+    return _selected_codec
+
+def get_json_codec() -> JsonCodec:
+    if _selected_codec is None:
+        return set_json_codec(os.environ.get(JSON_CODEC_ENV))
+    return _selected_codec
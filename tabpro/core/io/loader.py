@@ -2,12 +2,21 @@
 Loader class is responsible for loading the data from the source.
 '''
 
-import os.path
-
 from rich.console import Console
 
-from . extensions.manage_loaders import get_loader
+from . compression import (
+    get_compression,
+    get_extension,
+)
+from . prefetch import prefetch
+from . extensions.manage_loaders import (
+    get_counter,
+    get_loader,
+    get_range_loader,
+    is_slow_counter,
+)
 from ..classes.row import Row
+from ..classes.row_batch import RowBatch
 
 from .. progress import (
     Progress,
@@ -16,6 +25,8 @@ from .. progress import (
 
 from tqdm.auto import tqdm
 
+DEFAULT_BATCH_SIZE = 1024
+
 class Loader:
     def __init__(
         self,
@@ -24,28 +35,140 @@ class Loader:
         no_header: bool = False,
         limit: int | None = None,
         progress: Progress | None = None,
+        streaming: bool = False,
+        dialect: dict | None = None,
+        columns: list[str] | None = None,
+        table: str | None = None,
+        query: str | None = None,
+        prefetch: int = 0,
     ):
         self.source = source
         self.quiet = quiet
         self.no_header = no_header
         self.limit = limit
+        # NOTE: Rows are read again from the source for each iteration
+        #       instead of being kept in memory
+        self.streaming = streaming
+        # NOTE: Only the rows of a complete pass are kept
         self.rows: list[Row] | None = None
+        self.num_rows: int | None = None
         self.progress = progress
+        # NOTE: Options of the delimited text files (e.g. delimiter)
+        self.dialect = dialect
+        # NOTE: Only these columns are loaded if the format can skip the
+        #       others (e.g. Parquet)
+        self.columns = columns
+        # NOTE: Table or query to load the rows from a database (e.g. SQLite)
+        self.table = table
+        self.query = query
+        # NOTE: Number of the batches of the rows decoded ahead in a
+        #       background thread, 0 to decode them on demand
+        self.prefetch = prefetch
         self.fn_load = get_loader(
             self.source,
         )
-        self.extension = os.path.splitext(self.source)[1]
+        self.fn_count = get_counter(
+            self.source,
+        )
+        self.fn_load_range = get_range_loader(
+            self.source,
+        )
+        self.extension = get_extension(self.source)
 
     def __iter__(self):
         return self._yield_data()
     
     def __len__(self):
-        if self.rows is None:
+        if self.num_rows is None:
+            # NOTE: Counted without keeping the rows in streaming mode
             for _ in self._yield_data():
                 pass
-        if self.rows is None:
-            raise ValueError('No rows loaded')
-        return len(self.rows)
+        return self.num_rows
+
+    def count(
+        self,
+        load: bool = True,
+    ):
+        '''
+        Count the rows without building them if the format supports it,
+        otherwise by loading the rows (or None with load=False).
+        '''
+        if self.num_rows is not None:
+            return self.num_rows
+        if self.fn_count is None:
+            if not load:
+                return None
+            return len(self)
+        num_rows = self.fn_count(
+            self.source,
+            no_header=self.no_header,
+            dialect=self.dialect,
+            table=self.table,
+            query=self.query,
+        )
+        if self.limit:
+            num_rows = min(num_rows, self.limit)
+        return num_rows
+
+    def iter_indexed(
+        self,
+        start: int = 0,
+        stop: int | None = None,
+        skip_rows: set[int] | None = None,
+    ):
+        '''
+        Iterate the indices and the rows in the range (negative indices
+        count from the end as slices), except the rows to skip.
+        The rows out of the range or skipped are not decoded if the format
+        supports it.
+        '''
+        if start < 0 or (stop is not None and stop < 0):
+            num_rows = self.count()
+            if start < 0:
+                start = max(num_rows + start, 0)
+            if stop is not None and stop < 0:
+                stop = max(num_rows + stop, 0)
+        if self.limit:
+            stop = self.limit if stop is None else min(stop, self.limit)
+        if self.fn_load_range is None or self.rows is not None or \
+                (start == 0 and stop is None and not skip_rows):
+            for index, row in enumerate(self):
+                if stop is not None and index >= stop:
+                    break
+                if index < start:
+                    continue
+                if skip_rows and index in skip_rows:
+                    continue
+                yield index, row
+            return
+        yield from self.fn_load_range(
+            self.source,
+            start=start,
+            stop=stop,
+            skip_rows=skip_rows,
+            quiet=self.quiet,
+            progress=self.progress,
+        )
+        if start == 0 and stop is None:
+            self.num_rows = self.count()
+
+    def iter_batches(
+        self,
+        batch_size: int = DEFAULT_BATCH_SIZE,
+    ):
+        '''
+        Iterate the rows in batches stored column by column.
+        '''
+        if batch_size <= 0:
+            raise ValueError(f'invalid batch size: {batch_size}')
+        rows = []
+        for row in self:
+            rows.append(row)
+            if len(rows) >= batch_size:
+                yield RowBatch.from_rows(rows)
+                rows = []
+        if rows:
+            yield RowBatch.from_rows(rows)
 
     def _get_console(self):
         if self.console is None:
@@ -53,17 +176,36 @@ class Loader:
         return self.console
     
     def _yield_data(self):
-        if self.rows:
-            for row in self.rows:
-                yield row
-        else:
-            self.rows = []
-            for row in self.fn_load(
-                self.source,
-                quiet=self.quiet,
-                no_header=self.no_header,
-                progress=self.progress,
-                limit=self.limit,
-            ):
-                self.rows.append(row)
-                yield row
+        if self.rows is not None:
+            yield from self.rows
+            return
+        rows = None if self.streaming else []
+        num_rows = 0
+        total = None
+        if not self.quiet and not self.limit and not get_compression(self.source):
+            # NOTE: Total of the progress bar, cheap compared to the loading
+            #       unless the file should be decompressed once more
+            if not is_slow_counter(self.source):
+                total = self.count(load=False)
+        loaded = self.fn_load(
+            self.source,
+            quiet=self.quiet,
+            no_header=self.no_header,
+            progress=self.progress,
+            limit=self.limit,
+            total=total,
+            dialect=self.dialect,
+            columns=self.columns,
+            table=self.table,
+            query=self.query,
+        )
+        if self.prefetch:
+            loaded = prefetch(loaded, self.prefetch)
+        for row in loaded:
+            if rows is not None:
+                rows.append(row)
+            num_rows += 1
+            yield row
+        self.num_rows = num_rows
+        if rows is not None:
+            self.rows = rows
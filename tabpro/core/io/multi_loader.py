@@ -0,0 +1,244 @@
+'''
+MultiLoader class
+
+Loaders of many input files, parsing the small ones in a process pool while
+the rows of the previous ones are processed. Glob patterns and directories
+in the inputs are expanded into the files.
+'''
+
+import glob
+import os
+
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+
+from . compression import get_extension
+from . extensions.manage_loaders import dict_loaders
+from . loader import Loader
+from . parallel import (
+    get_mp_context,
+    get_num_workers,
+)
+from .. progress import Progress
+
+# NOTE: Larger files are loaded as streams not to keep all the rows, with
+#       their own progress bars
+MAX_SMALL_FILE_SIZE = 64 << 20
+
+# NOTE: Smaller files in total are loaded faster than starting the worker
+#       processes
+PARALLEL_MIN_SIZE = 64 << 20
+
+# NOTE: Total size of the files loaded in the worker processes and not
+#       yielded yet, their rows take several times more memory
+MAX_PENDING_BYTES = 256 << 20
+
+def is_supported(
+    path: str,
+):
+    # NOTE: e.g. Not "notes.txt" in a directory
+    return os.path.isfile(path) and get_extension(path) in dict_loaders
+
+def expand_input_files(
+    inputs: list[str],
+):
+    '''
+    Input files with the glob patterns and the directories expanded,
+    in the sorted order.
+    '''
+    input_files = []
+    for path in inputs:
+        if os.path.isdir(path):
+            for root, dirs, files in os.walk(path):
+                dirs.sort()
+                for name in sorted(files):
+                    if is_supported(os.path.join(root, name)):
+                        input_files.append(os.path.join(root, name))
+        elif not os.path.exists(path) and glob.has_magic(path):
+            matched = [
+                matched_path
+                for matched_path in sorted(glob.glob(path, recursive=True))
+                if is_supported(matched_path)
+            ]
+            if not matched:
+                raise FileNotFoundError(f'No files matched: {path}')
+            input_files.extend(matched)
+        elif not os.path.exists(path):
+            raise FileNotFoundError(f'File not found: {path}')
+        else:
+            input_files.append(path)
+    return input_files
+
+def _load_rows(
+    source: str,
+    options: dict,
+):
+    # NOTE: Nothing to overlap with in the worker processes
+    options = dict(options, prefetch=0)
+    return list(Loader(source, quiet=True, **options))
+
+class MultiLoader:
+    def __init__(
+        self,
+        inputs: list[str],
+        ordered: bool = True,
+        num_workers: int | None = None,
+        progress: Progress | None = None,
+        quiet: bool = False,
+        **options,
+    ):
+        '''
+        Options (e.g. no_header) are passed to the loader of each file.
+        With ordered=False, the files are yielded as soon as they are
+        loaded.
+        By default, the worker processes are used only if the small files
+        total PARALLEL_MIN_SIZE or more. They are started from a fork
+        server (or spawned), which imports the main module, so the scripts
+        using them should be guarded by `if __name__ == '__main__':`.
+        '''
+        self.input_files = expand_input_files(inputs)
+        self.ordered = ordered
+        if num_workers is None:
+            num_workers = get_num_workers(
+                sum(
+                    os.path.getsize(source) for source in self.input_files
+                    if self._is_small(source)
+                ),
+                PARALLEL_MIN_SIZE,
+            )
+        if len(self.input_files) <= 1:
+            num_workers = 1
+        self.num_workers = num_workers
+        self.progress = progress
+        self.quiet = quiet
+        self.options = options
+        self.task_id = None
+
+    def _is_small(
+        self,
+        source: str,
+    ):
+        if len(self.input_files) <= 1:
+            return False
+        return os.path.getsize(source) <= MAX_SMALL_FILE_SIZE
+
+    def _get_loader(
+        self,
+        source: str,
+        future: Future | None = None,
+    ):
+        # NOTE: Many small files are shown by one progress bar instead of
+        #       the progress bars of each file
+        loader = Loader(
+            source,
+            quiet=self.quiet or self._is_small(source),
+            progress=self.progress,
+            streaming=future is None,
+            **self.options,
+        )
+        if future is not None:
+            loader.rows = future.result()
+            loader.num_rows = len(loader.rows)
+        if self.task_id is not None:
+            self.progress.update(self.task_id, advance=1)
+        return loader
+
+    def __len__(self):
+        return len(self.input_files)
+
+    def __iter__(self):
+        if self.progress and not self.quiet and len(self.input_files) > 1:
+            self.task_id = self.progress.add_task(
+                'Loading files...',
+                total=len(self.input_files),
+            )
+        if self.num_workers <= 1:
+            for source in self.input_files:
+                yield self._get_loader(source)
+            return
+        # NOTE: Bounded not to keep the rows of too many files, by the
+        #       number and the total size of the files
+        max_pending = 2 * self.num_workers
+        executor = ProcessPoolExecutor(
+            self.num_workers,
+            mp_context=get_mp_context(),
+        )
+        try:
+            if self.ordered:
+                yield from self._iter_ordered(executor, max_pending)
+            else:
+                yield from self._iter_unordered(executor, max_pending)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _get_pending_size(
+        self,
+        source: str,
+    ):
+        '''
+        Size of the file to be loaded in a worker process, or None for the
+        file to be loaded as a stream.
+        '''
+        if not self._is_small(source):
+            return None
+        return os.path.getsize(source)
+
+    def _iter_ordered(
+        self,
+        executor: ProcessPoolExecutor,
+        max_pending: int,
+    ):
+        pending = deque()
+        pending_bytes = 0
+        for source in self.input_files:
+            size = self._get_pending_size(source)
+            while pending and (
+                len(pending) >= max_pending or
+                pending_bytes + (size or 0) > MAX_PENDING_BYTES
+            ):
+                pending_source, future, pending_size = pending.popleft()
+                pending_bytes -= pending_size
+                yield self._get_loader(pending_source, future)
+            future = None
+            if size is not None:
+                future = executor.submit(_load_rows, source, self.options)
+                pending_bytes += size
+            pending.append((source, future, size or 0))
+        while pending:
+            pending_source, future, _ = pending.popleft()
+            yield self._get_loader(pending_source, future)
+
+    def _iter_unordered(
+        self,
+        executor: ProcessPoolExecutor,
+        max_pending: int,
+    ):
+        pending: dict[Future, tuple[str, int]] = {}
+        pending_bytes = 0
+        def iter_done():
+            nonlocal pending_bytes
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                source, size = pending.pop(future)
+                pending_bytes -= size
+                yield self._get_loader(source, future)
+        for source in self.input_files:
+            size = self._get_pending_size(source)
+            if size is None:
+                yield self._get_loader(source)
+                continue
+            while pending and (
+                len(pending) >= max_pending or
+                pending_bytes + size > MAX_PENDING_BYTES
+            ):
+                yield from iter_done()
+            future = executor.submit(_load_rows, source, self.options)
+            pending[future] = (source, size)
+            pending_bytes += size
+        while pending:
+            yield from iter_done()
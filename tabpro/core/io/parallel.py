@@ -0,0 +1,60 @@
+'''
+Number of the worker processes for parallel loading
+
+The number is decided by the size of the input unless it is specified with
+the TABPRO_WORKERS environment variable or the --workers option.
+'''
+
+import multiprocessing
+import os
+
+WORKERS_ENV = 'TABPRO_WORKERS'
+
+_num_workers: int | None = None
+
+def set_num_workers(
+    num_workers: int | None,
+):
+    '''
+    Set the number of the worker processes, 0 for the number of the CPUs,
+    or None to decide it by the size of the input.
+    '''
+    global _num_workers
+    if num_workers is not None and num_workers < 0:
+        raise ValueError(f'invalid number of workers: {num_workers}')
+    _num_workers = num_workers
+
+def get_num_workers(
+    input_size: int = 0,
+    min_size: int = 0,
+) -> int:
+    '''
+    Number of the worker processes for an input of the given size.
+    By default, the inputs smaller than min_size are loaded serially.
+    '''
+    num_workers = _num_workers
+    if num_workers is None:
+        env = os.environ.get(WORKERS_ENV)
+        if env:
+            num_workers = int(env)
+    if num_workers is None:
+        if input_size < min_size:
+            return 1
+        num_workers = 0
+    if num_workers == 0:
+        num_workers = os.cpu_count() or 1
+    return num_workers
+
+def get_mp_context():
+    '''
+    Context of the worker processes, which are not forked from this process
+    because it may have threads (e.g. the refresh thread of the progress
+    bars).
+    '''
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        # NOTE: The workers are forked from the server with the modules
+        #       imported, instead of importing them in each worker
+        context.set_forkserver_preload([__package__])
+        return context
+    return multiprocessing.get_context('spawn')
@@ -0,0 +1,87 @@
+'''
+Rows decoded in a background thread
+
+The rows are passed in batches through a bounded queue, so that reading and
+decompressing the next rows (which release the GIL) overlap with the
+processing of the previous rows, with a limited number of rows in memory.
+'''
+
+import queue
+import threading
+
+from typing import (
+    Iterable,
+    Iterator,
+    TypeVar,
+)
+
+T = TypeVar('T')
+
+PREFETCH_BATCH_SIZE = 256
+
+# NOTE: Number of the batches waiting in the queue by default
+DEFAULT_PREFETCH_BATCHES = 16
+
+_END = object()
+
+class _Error:
+    def __init__(self, error: BaseException):
+        self.error = error
+
+def prefetch(
+    iterable: Iterable[T],
+    max_batches: int = DEFAULT_PREFETCH_BATCHES,
+    batch_size: int = PREFETCH_BATCH_SIZE,
+) -> Iterator[T]:
+    '''
+    Iterate the items of the iterable, which is iterated in a background
+    thread. The errors are raised again when they are reached.
+    '''
+    if max_batches <= 0:
+        raise ValueError(f'invalid number of prefetched batches: {max_batches}')
+    items = iter(iterable)
+    batches: queue.Queue = queue.Queue(max_batches)
+    stopped = threading.Event()
+
+    def put(item):
+        while not stopped.is_set():
+            try:
+                batches.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run():
+        try:
+            batch = []
+            for item in items:
+                batch.append(item)
+                if len(batch) >= batch_size:
+                    if not put(batch):
+                        return
+                    batch = []
+            if batch and not put(batch):
+                return
+            put(_END)
+        except BaseException as e:
+            put(_Error(e))
+        finally:
+            # NOTE: e.g. The file opened by the generator when stopped early
+            close = getattr(items, 'close', None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    try:
+        while True:
+            batch = batches.get()
+            if batch is _END:
+                break
+            if isinstance(batch, _Error):
+                raise batch.error
+            yield from batch
+    finally:
+        stopped.set()
+        thread.join()
@@ -0,0 +1,50 @@
+'''
+RowSpool class
+
+Rows kept in a temporary file instead of memory, for the writers which need
+all the rows before writing any of them (e.g. JSON arrays, Excel sheets).
+'''
+
+import pickle
+import tempfile
+
+from typing import (
+    Iterator,
+)
+
+from ..classes.row import Row
+
+class RowSpool:
+    def __init__(self):
+        self.fobj = tempfile.TemporaryFile()
+        self.pickler = pickle.Pickler(self.fobj, protocol=pickle.HIGHEST_PROTOCOL)
+        self.num_rows = 0
+
+    def append(self, row: Row):
+        self.pickler.dump(row)
+        # NOTE: The memos keep the references to all the rows otherwise
+        self.pickler.clear_memo()
+        self.num_rows += 1
+
+    def __iter__(self) -> Iterator[Row]:
+        if self.fobj is None:
+            raise ValueError('spool already closed')
+        self.fobj.flush()
+        end = self.fobj.tell()
+        self.fobj.seek(0)
+        try:
+            for _ in range(self.num_rows):
+                # NOTE: A new unpickler for each row, as the memo of an
+                #       unpickler keeps the references to all the rows
+                yield pickle.load(self.fobj)
+        finally:
+            # NOTE: Rows can be appended again after the iteration
+            self.fobj.seek(end)
+
+    def __len__(self):
+        return self.num_rows
+
+    def close(self):
+        if self.fobj is not None:
+            self.fobj.close()
+            self.fobj = None
@@ -10,6 +10,10 @@ import pandas as pd
 from rich.console import Console
 
 from ..classes.row import Row
+from ..classes.row_batch import RowBatch
+
+from .compression import open_file
+from .row_spool import RowSpool
 
 from ..progress import (
     Progress,
@@ -18,6 +22,9 @@ from ..progress import (
 
 from tqdm.auto import tqdm
 
+# NOTE: Number of the rows shown by the progress bar at once
+PROGRESS_INTERVAL = 1024
+
 class BaseWriter:
     def __init__(
         self,
@@ -27,17 +34,29 @@ class BaseWriter:
         encoding: str = 'utf-8',
         skip_header: bool = False,
         progress: Progress | None = None,
+        background_compression: bool | None = None,
+        background_writing: bool = False,
     ):
         self.target = target
         self.streaming = streaming
         self.quiet = quiet
         self.encoding = encoding
         self.skip_header = skip_header
-        self.rows: list[Row] | None = None
+        # NOTE: Whether to compress (e.g. "*.jsonl.gz") in a background
+        #       thread, None to decide by the number of the CPUs
+        self.background_compression = background_compression
+        # NOTE: Whether to encode and write the rows in a background thread
+        #       if the writer supports it, the rows should not be modified
+        #       after being pushed then
+        self.background_writing = background_writing
+        # NOTE: Rows to be written at last by non-streaming writers
+        self.rows: RowSpool | None = None
+        self.num_rows: int = 0
         self.fobj: IO | None = None
         self.finished: bool = False
         self.progress: Progress | None = progress
         self.task_id: TaskID | None = None
+        self.num_unreported_rows: int = 0
         if not self.support_streaming():
             self.streaming = False
         if self.streaming:
@@ -46,7 +65,15 @@ class BaseWriter:
     def _open(self):
         if self.fobj:
             return
-        self.fobj = open(self.target, 'w', encoding=self.encoding)
+        self.fobj = open_file(
+            self.target,
+            'w',
+            encoding=self.encoding,
+            background=self.background_compression,
+        )
+        self._start_progress()
+
+    def _start_progress(self):
         if self.streaming:
             if self.progress:
                 if self.task_id is None:
@@ -60,18 +87,41 @@ class BaseWriter:
         return False
 
     def push_row(self, row: Row | pd.Series):
-        if self.rows is None:
-            self.rows = []
         if isinstance(row, pd.Series):
             new_row = Row()
             for key in row.keys():
                 new_row[key] = row[key]
             row = new_row
-        self.rows.append(row)
-        if self.streaming:
-            self._write_row(row)
-            if self.progress and self.task_id is not None:
-                self.progress.update(self.task_id, advance=1)
+        self.num_rows += 1
+        if not self.streaming:
+            self._spool_row(row)
+            return
+        self._write_row(row)
+        self._advance(1)
+
+    def push_batch(self, batch: RowBatch):
+        if not self.streaming:
+            for row in batch.iter_rows():
+                self.push_row(row)
+            return
+        self._write_batch(batch)
+        self.num_rows += len(batch)
+        self._advance(len(batch))
+
+    def _advance(self, num_rows: int):
+        if self.progress and self.task_id is not None:
+            self.num_unreported_rows += num_rows
+            if self.num_unreported_rows >= PROGRESS_INTERVAL:
+                self._report_progress()
+
+    def _report_progress(self):
+        if self.progress and self.task_id is not None:
+            if self.num_unreported_rows:
+                self.progress.update(
+                    self.task_id,
+                    advance=self.num_unreported_rows,
+                )
+        self.num_unreported_rows = 0
 
     def push_rows(self, rows: list[Row] | pd.DataFrame):
         if isinstance(rows, pd.DataFrame):
@@ -87,20 +137,32 @@ class BaseWriter:
         else:
             return Console()
 
+    def _spool_row(self, row: Row):
+        if self.rows is None:
+            self.rows = RowSpool()
+        self.rows.append(row)
+
     def _write_row(self, row: Row):
         raise NotImplementedError
     
+    def _write_batch(self, batch: RowBatch):
+        for row in batch.iter_rows():
+            self._write_row(row)
+
     def _write_all_rows(self):
         raise NotImplementedError
     
     def close(self):
         if self.finished: return
-        if self.rows:
-            if not self.streaming:
+        self._report_progress()
+        if self.num_rows:
+            if self.rows:
                 if not self.quiet:
                     console = self._get_console()
                     console.log(f'writing {len(self.rows)} rows into: ', self.target)
                 self._write_all_rows()
+                self.rows.close()
+                self.rows = None
             self.finished = True
         if self.fobj:
             self.fobj.close()
@@ -1,7 +1,5 @@
 # -*- coding: utf-8 -*-
 
-import os
-
 from collections import OrderedDict
 
 from typing import (
@@ -22,12 +20,10 @@ from . constants import (
     FILE_ROW_INDEX_FIELD,
 )
 
-from . functions.search_column_value import search_column_value
-
 from . io import (
-    get_loader,
+    MultiLoader,
     get_writer,
-    save,
+    save_all,
 )
 
 from . classes.row import Row
@@ -69,6 +65,7 @@ def merge(
     merge_fields: list[str] | None = None,
     merge_staging: bool = False,
     use_staging: bool = False,
+    ordered: bool = True,
 ):
     progress = Progress(
         #redirect_stdout = False,
@@ -94,22 +91,22 @@ def merge(
     ]:
         if output_path:
             get_writer(output_path)
-    for previous_file in previous_files:
-        if not os.path.exists(previous_file):
-            raise FileNotFoundError(f'File not found: {previous_file}')
-        loader = get_loader(
-            previous_file,
-            progress=progress,
-        )
-        console.log('# rows: ', len(loader))
+    for loader in MultiLoader(
+        previous_files,
+        ordered=ordered,
+        progress=progress,
+    ):
+        previous_file = loader.source
         #for index, row in enumerate(tqdm(
         #    loader,
         #    desc=f'Loading: {previous_file}',
         #    total=len(loader),
         #)):
+        # NOTE: Passed as an iterator not to load the rows just to count them
         for index, row in enumerate(progress.track(
-            loader,
+            iter(loader),
             description=f'prcessing ...',
+            total=loader.count(load=False),
         )):
             set_staging_values(
                 row,
@@ -123,17 +120,17 @@ def merge(
                     raise ValueError(f'Duplicate key: {primary_key}')
             dict_key_to_row[primary_key] = row
             all_base_rows.append(row)
-    for modification_file in modification_files:
-        if not os.path.exists(modification_file):
-            raise FileNotFoundError(f'File not found: {modification_file}')
-        loader = get_loader(
-            modification_file,
-            progress=progress,
-        )
-        console.log('# rows: ', len(loader))
+        console.log('# rows: ', loader.num_rows)
+    for loader in MultiLoader(
+        modification_files,
+        ordered=ordered,
+        progress=progress,
+    ):
+        modification_file = loader.source
         for index, row in enumerate(progress.track(
-            loader,
+            iter(loader),
             description=f'processing ...',
+            total=loader.count(load=False),
         )):
             set_staging_values(
                 row,
@@ -167,7 +164,7 @@ def merge(
                     merge_fields.append('__staging__')
             #logger.debug('merge fields: %s', merge_fields)
             for field in merge_fields:
-                value, found = search_column_value(row.nested, field)
+                value, found = row.search(field)
                 #logger.debug('field: %s', field)
                 #logger.debug('found: %s', found)
                 #logger.debug('value: %s', value)
@@ -175,23 +172,17 @@ def merge(
                     target_row[field] = value
             set_modified_keys.add(primary_key)
             num_modified += 1
+        console.log('# rows: ', loader.num_rows)
     console.log('# modifications: ', num_modified)
     console.log('# modified rows: ', len(all_modified_rows))
     if ignore_not_found:
         logger.debug('# ignored keys: %s', len(list_ignored_keys))
+    outputs = []
     if output_base_data_file:
         #ic('Saving to: ', output_base_data_file)
-        save(
-            all_base_rows,
-            output_base_data_file,
-            progress=progress,
-        )
+        outputs.append((all_base_rows, output_base_data_file))
     if output_modified_data_file:
-        save(
-            all_modified_rows,
-            output_modified_data_file,
-            progress=progress,
-        )
+        outputs.append((all_modified_rows, output_modified_data_file))
     if output_remaining_data_file:
         remaining_rows = []
         for key, row in dict_key_to_row.items():
@@ -200,9 +191,7 @@ def merge(
         #ic(len(remaining_rows))
         #ic('Saving to: ', output_remaining_data_file)
         console.log('# remaining rows: ', len(remaining_rows))
-        save(
-            remaining_rows,
-            output_remaining_data_file,
-            progress=progress,
-        )
+        outputs.append((remaining_rows, output_remaining_data_file))
+    # NOTE: The files are written concurrently
+    save_all(outputs, progress=progress)
     progress.stop()
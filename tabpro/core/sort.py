@@ -1,7 +1,6 @@
 # -*- coding: utf-8 -*-
 
 import json
-import os
 import sys
 
 from collections import OrderedDict
@@ -19,8 +18,8 @@ from . progress import Progress
 from .classes.row import Row
 
 from . io import (
+    MultiLoader,
     check_writer,
-    get_loader,
     get_writer,
 )
 
@@ -36,6 +35,7 @@ def sort(
     output_file: str | None = None,
     reverse: bool = False,
     verbose: bool = False,
+    ordered: bool = True,
 ):
     progress = Progress(
         redirect_stdout = False,
@@ -46,17 +46,15 @@ def sort(
     if output_file:
         check_writer(output_file)
     all_input_row_items: list[tuple[Any, Row]] = []
-    for input_file in input_files:
-        if not os.path.exists(input_file):
-            raise FileNotFoundError(f'File not found: {input_file}')
-        loader = get_loader(
-            input_file,
-            progress=progress,
-        )
-        console.log('# rows: ', len(loader))
+    for loader in MultiLoader(
+        input_files,
+        ordered=ordered,
+        progress=progress,
+    ):
         for index, row in enumerate(loader):
             primary_key = get_primary_key(row, sort_keys)
             all_input_row_items.append((primary_key, row))
+        console.log('# rows: ', loader.num_rows)
     console.log('# input rows: ', len(all_input_row_items))
     console.log('sorting rows...')
     all_input_row_items.sort(
@@ -0,0 +1,100 @@
+import pytest
+from tabpro.core.classes.row import Row
+from tabpro.core.io.loader import Loader
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.arrow', '.feather'])
+def test_arrow_files(tmp_path, suffix):
+    # Test that nested rows are written in batches and read back
+    pytest.importorskip('pyarrow')
+    from tabpro.core.io.extensions.io_arrow import ArrowWriter
+    path = str(tmp_path / f'data{suffix}')
+    rows = [
+        Row.from_dict({'a': i, 'b.c': f'x{i}', 'b.d': [i], 'e': None})
+        for i in range(5)
+    ]
+    writer = ArrowWriter(path, batch_size=2)
+    writer.push_rows(rows)
+    writer.close()
+    loader = Loader(path, quiet=True)
+    assert loader.count() == 5
+    assert [row.nested for row in loader] == [row.nested for row in rows]
+    loader = Loader(path, quiet=True, columns=['b'])
+    assert [row.nested for row in loader][0] == {'b': {'c': 'x0', 'd': [0]}}
+    writer = ArrowWriter(str(tmp_path / f'bad{suffix}'), batch_size=1)
+    writer.push_row(Row.from_dict({'a': 1}))
+    with pytest.raises(ValueError):
+        writer.push_row(Row.from_dict({'a': 'x'}))
+
+@pytest.mark.parametrize('suffix', ['.parquet', '.arrow'])
+def test_arrow_schema_widening(tmp_path, suffix):
+    # Test that the later rows add the columns and widen the types of the
+    # batches already written
+    pytest.importorskip('pyarrow')
+    from tabpro.core.io.extensions.io_arrow import ArrowWriter
+    path = tmp_path / f'data{suffix}'
+    rows = [
+        {'a': 1, 'm': {'k': 1}},
+        {'a': 2, 'm': {'k': 2}},
+        {'a': 2.5, 'm': {'k': 3}},
+        {'a': 4, 'b': 'x', 'm': {'k': 4, 'j': 'y'}},
+        {'a': None, 'm': None},
+    ]
+    writer = ArrowWriter(str(path), batch_size=2)
+    writer.push_rows([Row.from_nested(dict(row)) for row in rows])
+    writer.close()
+    assert [p.name for p in tmp_path.iterdir()] == [path.name]
+    loaded = [row.nested for row in Loader(str(path), quiet=True)]
+    assert [row['a'] for row in loaded] == [1, 2, 2.5, 4, None]
+    assert [row['b'] for row in loaded] == [None, None, None, 'x', None]
+    assert loaded[0]['m'] == {'k': 1, 'j': None}
+    assert loaded[3]['m'] == {'k': 4, 'j': 'y'}
+    writer = ArrowWriter(str(tmp_path / f'mixed{suffix}'), batch_size=2)
+    with pytest.raises(ValueError):
+        writer.push_rows([Row.from_dict({'a': 1}), Row.from_dict({'a': 'x'})])
+
+def test_arrow_pick_columns(tmp_path):
+    # Test that the picked fields of the input or the staging area do not
+    # drop the columns or the rows loaded
+    pytest.importorskip('pyarrow')
+    import json
+    from tabpro.core.convert import convert
+    from tabpro.core.io.extensions.io_arrow import ArrowWriter
+    path = str(tmp_path / 'data.parquet')
+    writer = ArrowWriter(path)
+    writer.push_rows([Row.from_dict({'a': i, 'b': f'x{i}'}) for i in range(3)])
+    writer.close()
+    def pick(*columns):
+        output_file = tmp_path / 'out.jsonl'
+        convert([path], str(output_file), list_pick_columns=list(columns))
+        return [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert len(pick('__staging__.__file__')) == 3
+    assert len(pick('missing')) == 3
+    assert pick('a2=__staging__.__input__.a') == [{'a2': i} for i in range(3)]
+    assert pick('a', 'b2=__staging__.__input__.b')[0] == {'a': 0, 'b2': 'x0'}
+
+def test_arrow_struct_round_trip(tmp_path):
+    # Test that the struct columns are loaded as the nested fields, so that
+    # they are flattened into the CSV columns
+    pytest.importorskip('pyarrow')
+    import csv
+    import json
+    from tabpro.core.convert import convert
+    rows = [
+        {'id': 1, 'm': {'k': 1, 'n': {'x': 'a'}}},
+        {'id': 2, 'm': {'k': 2, 'n': {'x': 'b'}}},
+    ]
+    input_file = tmp_path / 'data.jsonl'
+    input_file.write_text(''.join(json.dumps(row) + '\n' for row in rows))
+    parquet_file = str(tmp_path / 'data.parquet')
+    convert([str(input_file)], parquet_file)
+    output_file = tmp_path / 'out.jsonl'
+    convert([parquet_file], str(output_file))
+    lines = output_file.read_text().splitlines()
+    assert [json.loads(line) for line in lines] == rows
+    output_file = tmp_path / 'out.csv'
+    convert([parquet_file], str(output_file))
+    with open(output_file, newline='') as f:
+        assert list(csv.DictReader(f)) == [
+            {'id': '1', 'm.k': '1', 'm.n.x': 'a'},
+            {'id': '2', 'm.k': '2', 'm.n.x': 'b'},
+        ]
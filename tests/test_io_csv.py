@@ -0,0 +1,66 @@
+import pytest
+from tabpro.core.classes.row import Row
+from tabpro.core.io.loader import Loader
+
+@pytest.mark.parametrize('text', [
+    'a,b\r\n1,"x\r\ny"\r\n2,"""q"""\r\n3,\r\n',
+    '﻿a,b\n1,"x\ny"\n' * 20 + '4,5',
+    'a,b\n1,x"y\n2,"z\n3,w\n',
+])
+def test_load_csv_parallel(tmp_path, text):
+    # Test that the chunks parsed in parallel are same as the serial ones
+    import csv
+    from tabpro.core.io.extensions.csv_parallel import iter_csv_records
+    from tabpro.core.io.extensions.io_csv import load_csv
+    path = tmp_path / 'data.csv'
+    path.write_bytes(text.encode('utf-8'))
+    with open(path, encoding='utf-8-sig') as f:
+        expected = list(csv.reader(f))
+    records = iter_csv_records(str(path), 'utf-8-sig', 2, chunk_size=8)
+    assert list(records) == expected
+    rows = load_csv(str(path), quiet=True, num_workers=2)
+    assert [row.flat for row in rows] == [
+        dict(zip(expected[0], record)) for record in expected[1:]
+    ]
+
+@pytest.mark.parametrize('text', [
+    'a,b\r\n1,\r\n\r\n,2\r3',
+    'a,b\n1,2\n3,"x\ny"\n4,5\n',
+    '"a",b\n1,2\n',
+])
+def test_fast_csv_reader(monkeypatch, text):
+    # Test that the lines without double quotes are split same as csv.reader
+    import csv
+    import io
+    from tabpro.core.io.extensions import csv_reader
+    monkeypatch.setattr(csv_reader, 'SNIFF_SIZE', 4)
+    def read(fn):
+        return list(fn(io.StringIO(text, newline=None)))
+    assert read(csv_reader.fast_csv_reader) == read(csv.reader)
+
+def test_delimited_dialects(tmp_path):
+    # Test that TSV and custom dialects are written and read back
+    from tabpro.core.io import get_writer
+    from tabpro.core.io.extensions.io_csv import load_csv
+    rows = [
+        Row.from_dict({'a': 'x,y', 'b': 'p|q'}),
+        Row.from_dict({'a': 'tab\there', 'b': ''}),
+    ]
+    for name, dialect in [
+        ('data.tsv', None),
+        ('data.psv', None),
+        ('data.csv', {'delimiter': ';', 'quoting': 'all'}),
+        ('data.txt.csv', {'quoting': 'none', 'escapechar': '\\'}),
+    ]:
+        path = str(tmp_path / name)
+        writer = get_writer(path, dialect=dialect)
+        writer.push_rows(rows)
+        writer.close()
+        loader = Loader(path, quiet=True, dialect=dialect)
+        assert loader.count() == 2
+        assert [row.flat for row in loader] == [row.flat for row in rows]
+    assert (tmp_path / 'data.tsv').read_bytes().startswith(b'a\tb\r\n')
+    rows = load_csv(str(tmp_path / 'data.tsv'), quiet=True, num_workers=2)
+    assert [row['a'] for row in rows] == ['x,y', 'tab\there']
+    with pytest.raises(ValueError):
+        Loader(str(tmp_path / 'data.tsv'), dialect={'sep': ','}).count()
@@ -0,0 +1,71 @@
+from tabpro.core.classes.row import Row
+from tabpro.core.io.loader import Loader
+
+def test_load_excel(tmp_path):
+    # Test that the cells are converted into strings as pandas did
+    import datetime
+    import openpyxl
+    path = tmp_path / 'data.xlsx'
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['id', 'name', 2.0, None])
+    ws.append([1, 'alice', 1.0, 0.5])
+    ws.append([None, 'NA', True, datetime.datetime(2024, 1, 2)])
+    ws.append([None])
+    wb.save(path)
+    rows = list(Loader(str(path), quiet=True))
+    assert len(rows) == 2
+    assert list(rows[0].flat.items()) == [
+        ('id', '1'),
+        ('name', 'alice'),
+        ('2', '1'),
+        ('Unnamed: 3', '0.5'),
+    ]
+    assert list(rows[1].flat.values()) == [
+        None, None, 'True', '2024-01-02 00:00:00',
+    ]
+
+def test_count_excel(tmp_path):
+    # Test that the rows are counted as they are loaded, without the blank
+    # rows at the end of the sheet
+    import openpyxl
+    path = tmp_path / 'data.xlsx'
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.append(['id', 'name'])
+    ws.append([1, 'alice'])
+    ws.append([None, ''])
+    ws.append([3, 'carol'])
+    for _ in range(3):
+        ws.append([None, ''])
+    ws.cell(row=10, column=3).value = None
+    wb.save(path)
+    for no_header in [False, True]:
+        loader = Loader(str(path), quiet=True, no_header=no_header)
+        assert loader.count() == len(list(loader)) == 4 - (not no_header)
+
+def test_excel_writer_rollover(tmp_path, monkeypatch):
+    # Test that the header grows and the rows over the limit go to next sheets
+    import openpyxl
+    from tabpro.core.io import get_writer
+    from tabpro.core.io.extensions import io_excel
+    monkeypatch.setattr(io_excel, 'MAX_EXCEL_ROWS', 3)
+    path = tmp_path / 'out.xlsx'
+    writer = get_writer(str(path))
+    writer.push_rows([
+        Row.from_dict({'a': 1}),
+        Row.from_dict({'a': 2, 'b.c': [1]}),
+        Row.from_dict({'b.c': 'x'}),
+    ])
+    writer.close()
+    wb = openpyxl.load_workbook(path)
+    assert wb.sheetnames == ['Sheet1', 'Sheet2']
+    assert [list(row) for row in wb['Sheet1'].values] == [
+        ['a', 'b.c'],
+        [1, None],
+        [2, '[1]'],
+    ]
+    assert [list(row) for row in wb['Sheet2'].values] == [
+        ['a', 'b.c'],
+        [None, 'x'],
+    ]
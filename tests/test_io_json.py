@@ -0,0 +1,21 @@
+import io
+import json
+
+import pytest
+
+@pytest.mark.parametrize('chunk_size', range(1, 8))
+def test_iter_json_array_numbers(chunk_size):
+    # Test that numbers split at a chunk boundary are read in full
+    from tabpro.core.io.extensions.io_json import iter_json_array
+    text = json.dumps([
+        3.25, -1e-05, 1.5e+300, 12345678, {'a': 0.125, 'b': [6.02e23]},
+        'x', -0.0, 1E10, 7,
+    ])
+    f = io.StringIO(text)
+    assert list(iter_json_array(f, chunk_size=chunk_size)) == json.loads(text)
+    text = '[1, 2.5 ,3e2\n,  4 ]'
+    f = io.StringIO(text)
+    assert list(iter_json_array(f, chunk_size=chunk_size)) == json.loads(text)
+    f = io.StringIO('[1, 2x]')
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array(f, chunk_size=chunk_size))
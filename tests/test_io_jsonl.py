@@ -0,0 +1,23 @@
+from tabpro.core.io.loader import Loader
+
+def test_jsonl_index(tmp_path, monkeypatch):
+    # Test that the rows of JSONL are read at random through the index
+    from tabpro.core.io.extensions import jsonl_index
+    monkeypatch.setenv(jsonl_index.CACHE_DIR_ENV, str(tmp_path / 'cache'))
+    path = tmp_path / 'data' / 'data.jsonl'
+    path.parent.mkdir()
+    path.write_text(''.join(f'{{"a": {i}}}\n' for i in range(10)))
+    loader = Loader(str(path), quiet=True)
+    rows = loader.iter_indexed(2, 7, skip_rows={3, 5})
+    assert [(i, row['a']) for i, row in rows] == [(2, 2), (4, 4), (6, 6)]
+    assert [p.name for p in path.parent.iterdir()] == ['data.jsonl']
+    assert jsonl_index.get_index_file(str(path)).startswith(str(tmp_path / 'cache'))
+    assert [i for i, _ in loader.iter_indexed(-2)] == [8, 9]
+    assert jsonl_index.load_index(str(path))[1] == 10
+    with path.open('a') as f:
+        f.write('{"a": 10}')
+    assert jsonl_index.load_index(str(path)) is None
+    with jsonl_index.JsonlIndex(str(path), stride=3) as index:
+        assert len(index) == 11
+        assert index.offset(10) == path.stat().st_size - 9
+        assert list(index.iter_lines(10)) == [(10, '{"a": 10}')]
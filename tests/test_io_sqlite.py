@@ -0,0 +1,93 @@
+import pytest
+from tabpro.core.classes.row import Row
+from tabpro.core.io.loader import Loader
+
+def test_sqlite_files(tmp_path):
+    # Test that the rows are written into a table and loaded from a table
+    # or a query
+    import sqlite3
+    from tabpro.core.io.extensions.io_sqlite import SqliteWriter
+    path = str(tmp_path / 'data.sqlite')
+    writer = SqliteWriter(path, indexes=['a', ['b.c', 'a']], batch_size=7)
+    writer.push_rows([
+        Row.from_dict({'a': i, 'b': {'c': str(i)}, 'd': [i] if i else None})
+        for i in range(100)
+    ])
+    writer.close()
+    assert [p.name for p in tmp_path.iterdir()] == ['data.sqlite']
+    with sqlite3.connect(path) as connection:
+        assert [name for name, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'index' ORDER BY name"
+        )] == ['idx_data_a', 'idx_data_b.c_a']
+    rows = list(Loader(path, quiet=True))
+    assert rows[1].nested == {'a': 1, 'b': {'c': '1'}, 'd': [1]}
+    assert rows[0]['d'] is None
+    loader = Loader(path, quiet=True, query='SELECT a FROM data WHERE a < 10')
+    assert loader.count() == 10
+    assert [row.nested for row in loader][-1] == {'a': 9}
+    loader = Loader(path, quiet=True, columns=['b'])
+    assert list(next(iter(loader)).nested) == ['b']
+    with pytest.raises(ValueError):
+        list(Loader(path, quiet=True, table='missing'))
+
+def test_sqlite_json_columns(tmp_path):
+    # Test that all the values of a JSON column are encoded, so that the
+    # strings and the numbers are loaded back as they are
+    from tabpro.core.io.extensions.io_sqlite import SqliteWriter
+    path = str(tmp_path / 'data.sqlite')
+    values = [[1, 2], 'x', '[3]', 4, None, [{'k': 'v'}], '', 1.5]
+    writer = SqliteWriter(path, batch_size=2)
+    writer.push_rows([Row.from_dict({'a': value}) for value in values])
+    writer.close()
+    assert [row['a'] for row in Loader(path, quiet=True)] == values
+
+def test_sqlite_writer_failures(tmp_path):
+    # Test that the table is kept if the writing fails, and the columns
+    # found later are added
+    import sqlite3
+    from tabpro.core.io.extensions.io_sqlite import SqliteWriter
+    from tabpro.core.progress import Progress
+    path = str(tmp_path / 'data.sqlite')
+    writer = SqliteWriter(path, progress=Progress(redirect_stdout=False))
+    assert writer.task_id is not None
+    writer.push_rows([Row.from_dict({'a': i}) for i in range(3)])
+    writer.close()
+    writer = SqliteWriter(path, indexes=['missing'])
+    writer.push_row(Row.from_dict({'a': 10}))
+    with pytest.raises(ValueError):
+        writer.close()
+    writer = SqliteWriter(path, batch_size=1)
+    with pytest.raises(OverflowError):
+        writer.push_rows([Row.from_dict({'a': 1}), Row.from_dict({'a': 2**70})])
+    writer.close()
+    assert [row['a'] for row in Loader(path, quiet=True)] == [0, 1, 2]
+    with sqlite3.connect(path) as connection:
+        assert [name for name, in connection.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table'"
+        )] == ['data']
+    writer = SqliteWriter(path, batch_size=1)
+    writer.push_rows([Row.from_dict({'a': 1}), Row.from_dict({'b.c': [1]})])
+    writer.close()
+    assert [row.nested for row in Loader(path, quiet=True)] == [
+        {'a': 1, 'b': {'c': None}},
+        {'a': None, 'b': {'c': [1]}},
+    ]
+
+def test_sqlite_pick_columns(tmp_path):
+    # Test that the picked fields of the input or the staging area do not
+    # drop the columns or the rows loaded
+    import json
+    from tabpro.core.convert import convert
+    from tabpro.core.io.extensions.io_sqlite import SqliteWriter
+    path = str(tmp_path / 'data.sqlite')
+    writer = SqliteWriter(path)
+    writer.push_rows([Row.from_dict({'a': i, 'b': f'x{i}'}) for i in range(3)])
+    writer.close()
+    def pick(*columns):
+        output_file = tmp_path / 'out.jsonl'
+        convert([path], str(output_file), list_pick_columns=list(columns))
+        return [json.loads(line) for line in output_file.read_text().splitlines()]
+    assert len(pick('__staging__.__file__')) == 3
+    assert len(pick('missing')) == 3
+    assert pick('a2=__staging__.__input__.a') == [{'a2': i} for i in range(3)]
+    assert pick('a', 'b2=__staging__.__input__.b')[0] == {'a': 0, 'b2': 'x0'}
@@ -0,0 +1,18 @@
+import pytest
+
+@pytest.mark.parametrize('name', ['stdlib', 'orjson', 'ujson'])
+def test_json_codecs(name):
+    # Test that the codecs encode and decode the values as the standard
+    # library does
+    import json
+    from tabpro.core.io.json_codec import create_json_codec
+    try:
+        codec = create_json_codec(name)
+    except ValueError:
+        pytest.skip(f'{name} is not installed')
+    data = {'a': float('nan'), 'b': [float('inf'), None], 'c': 'あ', 'd': 2**70}
+    text = codec.dumps(data)
+    expected = json.dumps(data, ensure_ascii=False)
+    assert text.replace(' ', '') == expected.replace(' ', '')
+    assert codec.loads(text)['d'] == 2**70
+    assert codec.dumps({'a': None}).replace(' ', '') == '{"a":null}'
@@ -0,0 +1,118 @@
+import pytest
+from tabpro.core.io.loader import Loader
+
+def test_loader_streaming(tmp_path):
+    # Test that a streaming loader keeps no rows but can be iterated again
+    path = tmp_path / 'data.jsonl'
+    path.write_text('{"a": 1}\n{"a": 2}\n')
+    loader = Loader(str(path), quiet=True, streaming=True)
+    assert [row['a'] for row in loader] == [1, 2]
+    assert loader.rows is None
+    assert loader.num_rows == 2
+    assert [row['a'] for row in loader] == [1, 2]
+    loader = Loader(str(path), quiet=True)
+    for row in loader:
+        break
+    assert loader.rows is None
+    assert len(loader) == 2
+    assert [row['a'] for row in loader] == [1, 2]
+    path = tmp_path / 'empty.jsonl'
+    path.write_text('')
+    assert len(Loader(str(path), quiet=True)) == 0
+
+def test_loader_count(tmp_path):
+    # Test that the rows are counted without loading them
+    path = tmp_path / 'data.csv'
+    path.write_text('a,b\r\n1,"x\r\ny"\r\n2,"""z"""\r\n3,')
+    loader = Loader(str(path), quiet=True, streaming=True)
+    assert loader.count() == 3
+    assert loader.num_rows is None
+    assert len(loader) == 3
+    assert Loader(str(path), quiet=True, no_header=True).count() == 4
+    path = tmp_path / 'data.jsonl'
+    path.write_text('{"a": "x\\ny"}\n{"a": 2}')
+    assert Loader(str(path), quiet=True).count() == 2
+    assert Loader(str(path), quiet=True, limit=1).count() == 1
+    path = tmp_path / 'data.json'
+    path.write_text('[{"a": 1}]')
+    assert Loader(str(path), quiet=True).count(load=False) is None
+    assert Loader(str(path), quiet=True).count() == 1
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_multi_loader(tmp_path, ordered):
+    # Test that the files in a directory are loaded in a process pool
+    from tabpro.core.io import MultiLoader
+    for i in range(5):
+        (tmp_path / f'{i}.jsonl').write_text(f'{{"a": {i}}}\n{{"a": {i}}}\n')
+    (tmp_path / 'notes.txt').write_text('not a table')
+    loaders = list(MultiLoader([str(tmp_path)], ordered=ordered, num_workers=2))
+    sources = [loader.source.rsplit('/', 1)[-1] for loader in loaders]
+    if ordered:
+        assert sources == [f'{i}.jsonl' for i in range(5)]
+    assert sorted(sources) == [f'{i}.jsonl' for i in range(5)]
+    for loader in loaders:
+        assert [row['a'] for row in loader] == [int(loader.source[-7])] * 2
+    pattern = str(tmp_path / '[0-1].jsonl')
+    assert len(MultiLoader([pattern])) == 2
+    # NOTE: The small files are loaded serially by default
+    assert MultiLoader([str(tmp_path)]).num_workers == 1
+    with pytest.raises(FileNotFoundError):
+        MultiLoader([str(tmp_path / '*.csv')])
+
+def test_prefetch():
+    # Test that the items are prefetched in order and the errors are raised
+    from tabpro.core.io.prefetch import prefetch
+    assert list(prefetch(range(1000), max_batches=2, batch_size=7)) == \
+        list(range(1000))
+    def fail():
+        yield 1
+        raise KeyError('x')
+    items = prefetch(fail(), batch_size=1)
+    assert next(items) == 1
+    with pytest.raises(KeyError):
+        next(items)
+    closed = []
+    def endless():
+        try:
+            while True:
+                yield 0
+        finally:
+            closed.append(True)
+    items = prefetch(endless(), max_batches=1, batch_size=1)
+    next(items)
+    items.close()
+    assert closed == [True]
+
+def test_loader_progress_total(tmp_path):
+    # Test that the rows are counted for the progress bar only when cheap
+    import gzip
+    path = tmp_path / 'data.jsonl'
+    path.write_text('{"a": 1}\n{"a": 2}\n')
+    with gzip.open(tmp_path / 'data.jsonl.gz', 'wt') as f:
+        f.write(path.read_text())
+    def count(source, limit=None):
+        loader = Loader(source, limit=limit)
+        counted = []
+        loader.fn_count = lambda *args, **kwargs: counted.append(True) or 2
+        assert len(list(loader)) == (limit or 2)
+        return bool(counted)
+    assert count(str(path))
+    assert not count(str(path), limit=1)
+    assert not count(str(tmp_path / 'data.jsonl.gz'))
+
+@pytest.mark.parametrize('ordered', [True, False])
+def test_multi_loader_pending_bytes(tmp_path, monkeypatch, ordered):
+    # Test that the files in flight are bounded by their size and the
+    # unsupported files matched by a glob pattern are skipped
+    from tabpro.core.io import MultiLoader
+    from tabpro.core.io import multi_loader
+    monkeypatch.setattr(multi_loader, 'MAX_PENDING_BYTES', 1)
+    for i in range(4):
+        (tmp_path / f'{i}.jsonl').write_text(f'{{"a": {i}}}\n')
+    (tmp_path / '0.jsonl.idx').write_bytes(b'\0')
+    loaders = MultiLoader([str(tmp_path / '*')], ordered=ordered, num_workers=2)
+    assert len(loaders) == 4
+    rows = [row['a'] for loader in loaders for row in loader]
+    assert sorted(rows) == [0, 1, 2, 3]
+    if ordered:
+        assert rows == [0, 1, 2, 3]
@@ -166,3 +166,142 @@ def test_row_error_cases():
     
     with pytest.raises(KeyError):
         _ = row['a.b.c']  # Non-existent nested key
+
+def test_row_flat_view():
+    # Test that the flat view follows the nested representation
+    row = Row()
+    row['a.b'] = 1
+    assert row.flat == OrderedDict([('a.b', 1)])
+    row['a'] = {'c': 2, 'd': {'e': 3}}
+    assert list(row.flat.items()) == [('a.c', 2), ('a.d.e', 3)]
+    row.staging['x'] = 4
+    assert row.flat['__staging__.x'] == 4
+    assert list(row.keys()) == ['a.c', 'a.d.e']
+
+def test_row_pop():
+    # Test popping a subtree
+    row = Row()
+    row['a.b'] = 1
+    row['a.c'] = 2
+    row['ab'] = 3
+    assert row.pop('a.b') == (1, True)
+    assert list(row) == ['a.c', 'ab']
+    assert row.pop('a.x') == (None, False)
+    assert row.pop('x.y') == (None, False)
+    assert row.pop('a') == (OrderedDict([('c', 2)]), True)
+    assert list(row) == ['ab']
+
+def test_row_field_path():
+    # Test access with precompiled field paths
+    from tabpro.core.classes.field_path import FieldPath
+    path = FieldPath.of('a.b.1.c')
+    assert path is FieldPath.of('a.b.1.c')
+    assert path == 'a.b.1.c'
+    assert path.segments == ('a', 'b', '1', 'c')
+    assert path.indices == (None, None, 1, None)
+    row = Row()
+    row['a.b'] = [{'c': 1}, {'c': 2}]
+    assert row[path] == 2
+    assert row.get(path) == 2
+    assert path in row
+    assert FieldPath.of('a.b.2.c') not in row
+    row.staging[FieldPath.of('x')] = 3
+    assert row.search(FieldPath.of('x')) == (3, '__staging__.x')
+
+def test_compact_row():
+    # Test rows sharing one schema with the values kept in a list
+    from tabpro.core.classes.compact_row import CompactRow
+    from tabpro.core.classes.schema import Schema
+    schema = Schema(['id', 'a.b', 'a.c'])
+    assert schema.is_compact
+    assert not schema.is_flat
+    assert not Schema(['a', 'a.b']).is_compact
+    row = CompactRow(schema, ['1', 'x', 'y'])
+    assert row['a.b'] == 'x'
+    assert row['a'] == {'b': 'x', 'c': 'y'}
+    assert 'z' not in row
+    assert list(row.flat.items()) == [('id', '1'), ('a.b', 'x'), ('a.c', 'y')]
+    cloned = row.clone()
+    row['id'] = '2'
+    assert cloned['id'] == '1'
+    assert row._values is not None
+    row.staging['n'] = 3
+    assert row._values is None
+    assert row.search('n') == (3, '__staging__.n')
+    assert list(row.keys()) == ['id', 'a.b', 'a.c']
+    assert row['id'] == '2'
+
+def test_row_input_snapshot():
+    # Test the lazy input field attached from a snapshot
+    row = Row.from_dict({'a': 1, 'b.c': [1, 2]})
+    snapshot = row.snapshot(with_values=True)
+    row.staging['x'] = 0
+    row.attach_input(snapshot)
+    row['a'] = 2
+    row['b.c'].append(3)
+    row.pop('b.c')
+    assert row['__staging__.__input__.a'] == 1
+    assert row['__staging__.__input__.__values__.0'] == 1
+    assert row.search('b.c') == ([1, 2], '__staging__.__input__.b.c')
+    assert row.nested['__staging__'] == {
+        'x': 0,
+        '__input__': {'a': 1, 'b': {'c': [1, 2]}, '__values__': {'0': 1, '1': [1, 2]}},
+    }
+    row.drop_staging()
+    assert row.nested == {'a': 2, 'b': {}}
+
+def test_remap_columns_keeps_input_snapshot():
+    # Test that picking the fields does not build the input field
+    from tabpro.core.actions import remap_columns
+    from tabpro.core.actions.types import PickConfig
+    def build():
+        row = Row.from_dict({'a': 1, 'b.c': [1, 2], 'd': 3})
+        snapshot = row.snapshot(with_values=True)
+        row.staging['f'] = 'x'
+        row.attach_input(snapshot)
+        row['d'] = 4
+        return row
+    pick = [
+        PickConfig(source='a', target='x'),
+        PickConfig(source='__staging__.__input__.d', target='y'),
+    ]
+    row = build()
+    new_row = remap_columns(row, pick)
+    assert row._input is not None
+    assert new_row._input is not None
+    expected = build()
+    expected.nested
+    assert new_row.nested == remap_columns(expected, pick).nested
+    assert new_row['y'] == 3
+    assert new_row['__staging__.d'] == 4
+    assert new_row['__staging__.__input__.b.c'] == [1, 2]
+
+def test_row_flat_parts():
+    # Test that a write only rebuilds the flat view of its own subtree
+    row = Row.from_dict({'a.b': 1, 'a.c': 2, 'd': 3, 'e.f': 4})
+    row.staging['x.y'] = 5
+    assert list(row.items()) == [('a.b', 1), ('a.c', 2), ('d', 3), ('e.f', 4)]
+    part = row._flat_parts['e']
+    row['a.b'] = 6
+    assert row._flat_parts['e'] is part
+    assert 'a' not in row._flat_parts
+    assert list(row.keys(include_staging=True)) == [
+        'a.b', 'a.c', 'd', 'e.f', '__staging__.x.y',
+    ]
+    row.pop('a.c')
+    assert list(row.flat.items()) == [
+        ('a.b', 6), ('d', 3), ('e.f', 4), ('__staging__.x.y', 5),
+    ]
+
+def test_row_bulk_constructors():
+    # Test building rows from nested dictionaries and flat values
+    nested = {'a': {'b': 1}, 'c': [1, 2]}
+    row = Row.from_nested(nested)
+    assert row.nested is nested
+    assert row['a.b'] == 1
+    row = Row.from_nested({'a.b': 1, 'c': 2})
+    assert row.nested == {'a': {'b': 1}, 'c': 2}
+    row = Row.from_flat(['id', 'a.b'], ['1', '2'])
+    assert row.nested == {'id': '1', 'a': {'b': '2'}}
+    row = Row.from_flat(['a', 'a.b', 'a'], ['1', '2', '3'])
+    assert list(row.flat.items()) == [('a.b', '2')]
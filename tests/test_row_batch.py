@@ -0,0 +1,23 @@
+from tabpro.core.classes.row import Row
+
+def test_row_batch():
+    # Test rows stored column by column
+    from tabpro.core.classes.row_batch import RowBatch
+    from tabpro.core.classes.schema import Schema
+    schema = Schema(['id', 'a.b'])
+    rows = [Row.from_flat(schema, ['1', 'x']), Row.from_flat(schema, ['2'])]
+    batch = RowBatch.from_rows(rows)
+    assert batch.is_columnar
+    assert len(batch) == 2
+    assert batch.has_missing
+    assert batch.column('a.b')[0] == 'x'
+    assert [row.nested for row in batch] == [
+        {'id': '1', 'a': {'b': 'x'}},
+        {'id': '2'},
+    ]
+    batch.set_column('c', [3, 4])
+    assert list(batch.iter_values()) == [('1', 'x', 3), ('2', batch.column('a.b')[1], 4)]
+    batch = RowBatch.from_rows([Row.from_nested({'a': {}, '__staging__': {'x': 1}})])
+    assert not batch.is_columnar
+    batch.drop_staging()
+    assert list(batch.iter_nested()) == [{'a': {}}]
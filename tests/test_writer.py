@@ -0,0 +1,65 @@
+import pytest
+from tabpro.core.classes.row import Row
+from tabpro.core.io.loader import Loader
+
+def test_writer_keeps_no_rows(tmp_path):
+    # Test that streaming writers keep no rows and the others spool them
+    from tabpro.core.io import get_writer
+    import json
+    rows = [
+        Row.from_dict({'a': 1, 'b.c': 'x\ny'}),
+        Row.from_dict({'a': 2, 'b.d': []}),
+    ]
+    writer = get_writer(str(tmp_path / 'out.jsonl'))
+    writer.push_rows(rows)
+    assert writer.rows is None
+    assert writer.num_rows == 2
+    writer.close()
+    path = tmp_path / 'out.json'
+    writer = get_writer(str(path))
+    writer.push_rows(rows)
+    assert writer.rows.num_rows == 2
+    writer.close()
+    assert writer.rows is None
+    nested = [row.nested for row in rows]
+    assert path.read_text() == json.dumps(nested, ensure_ascii=False, indent=2)
+
+@pytest.mark.parametrize('suffix', ['.gz', '.bz2', '.xz'])
+@pytest.mark.parametrize('background', [False, True])
+def test_compressed_files(tmp_path, suffix, background):
+    # Test that compressed files are written and read transparently
+    from tabpro.core.io.extensions.io_jsonl import JsonLinesWriter
+    path = str(tmp_path / f'data.jsonl{suffix}')
+    writer = JsonLinesWriter(path, background_compression=background)
+    writer.push_rows([
+        Row.from_dict({'a': i, 'b': 'あ' * i}) for i in range(1000)
+    ])
+    writer.close()
+    loader = Loader(path, quiet=True)
+    assert loader.extension == '.jsonl'
+    assert loader.count() == 1000
+    rows = list(loader)
+    assert [row['a'] for row in rows] == list(range(1000))
+    assert rows[-1]['b'] == 'あ' * 999
+
+def test_background_writing(tmp_path):
+    # Test that the files written concurrently are the same and the errors
+    # in the writer threads are raised
+    from tabpro.core.io import save_all
+    from tabpro.core.io.extensions.io_jsonl import JsonLinesWriter
+    rows = [Row.from_dict({'a': i, 'b': {'c': str(i)}}) for i in range(3000)]
+    paths = [str(tmp_path / f'{i}.jsonl') for i in range(2)]
+    save_all([(rows, paths[0]), (rows[:10], paths[1])])
+    writer = JsonLinesWriter(str(tmp_path / 'sync.jsonl'))
+    writer.push_rows(rows)
+    writer.close()
+    assert open(paths[0]).read() == open(tmp_path / 'sync.jsonl').read()
+    assert len(open(paths[1]).readlines()) == 10
+    writer = JsonLinesWriter(
+        str(tmp_path / 'error.jsonl'),
+        batch_size=1,
+        background_writing=True,
+    )
+    with pytest.raises(TypeError):
+        writer.push_rows([Row.from_dict({'a': {1, 2}})] + rows)
+        writer.close()